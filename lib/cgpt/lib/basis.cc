@@ -159,3 +159,53 @@ EXPORT(linear_combination,{
     
     return PyLong_FromLong(0);
   });
+
+EXPORT(multi_linear_combination,{
+
+    PyObject* _dst,* _src,* _coef,* _ac;
+    int idx;
+    if (!PyArg_ParseTuple(args, "OOOOi", &_dst, &_src, &_coef, &_ac, &idx)) {
+      return NULL;
+    }
+
+    std::vector<cgpt_Lattice_base*> dst, src;
+    cgpt_basis_fill(dst,_dst,idx);
+    cgpt_basis_fill(src,_src,idx);
+
+    ASSERT(dst.size() > 0);
+
+    ComplexD* data;
+    int ndst, nsrc;
+    cgpt_numpy_import_matrix(_coef,data,ndst,nsrc);
+
+    ASSERT(ndst == (int)dst.size() && nsrc == (int)src.size());
+
+    std::vector<int> ac;
+    cgpt_convert(_ac,ac);
+    ASSERT(ac.size() == dst.size());
+
+    dst[0]->multi_linear_combination(dst,src,data,ac);
+
+    return PyLong_FromLong(0);
+  });
+
+EXPORT(lattice_rank_inner_product,{
+
+    PyObject* _left,* _right;
+    int diagonal, idx;
+    if (!PyArg_ParseTuple(args, "OOii", &_left, &_right, &diagonal, &idx)) {
+      return NULL;
+    }
+
+    std::vector<cgpt_Lattice_base*> left, right;
+    cgpt_basis_fill(left,_left,idx);
+    cgpt_basis_fill(right,_right,idx);
+
+    ASSERT(left.size() > 0 && right.size() > 0);
+
+    long n = diagonal ? (long)left.size() : (long)(left.size() * right.size());
+    PyArrayObject* res = (PyArrayObject*)PyArray_SimpleNew(1, &n, NPY_COMPLEX128);
+    left[0]->rank_inner_product((ComplexD*)PyArray_DATA(res),left,right,diagonal != 0);
+
+    return (PyObject*)res;
+  });
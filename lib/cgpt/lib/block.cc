@@ -18,46 +18,98 @@
 */
 #include "lib.h"
 
+// coarse is the list of v_obj of the coarse vector, all components are
+// handled in a single sweep over the fine grid
+static void cgpt_coarse_fill(std::vector<cgpt_Lattice_base*>& coarse, PyObject* _coarse) {
+  ASSERT(PyList_Check(_coarse));
+  coarse.resize(PyList_Size(_coarse));
+  for (size_t i=0;i<coarse.size();i++)
+    coarse[i] = (cgpt_Lattice_base*)PyLong_AsVoidPtr(PyList_GetItem(_coarse,i));
+  ASSERT(coarse.size() > 0);
+}
+
 EXPORT(block_project,{
 
-    PyObject* _basis;
-    void* _coarse,* _fine;
-    int idx;
-    if (!PyArg_ParseTuple(args, "llOi", &_coarse,&_fine,&_basis,&idx)) {
+    PyObject* _basis,* _coarse;
+    void* _fine;
+    int idx, ac;
+    if (!PyArg_ParseTuple(args, "OlOii", &_coarse,&_fine,&_basis,&idx,&ac)) {
       return NULL;
     }
 
     cgpt_Lattice_base* fine = (cgpt_Lattice_base*)_fine;
-    cgpt_Lattice_base* coarse = (cgpt_Lattice_base*)_coarse;
 
-    std::vector<cgpt_Lattice_base*> basis;
+    std::vector<cgpt_Lattice_base*> basis, coarse;
     cgpt_basis_fill(basis,_basis,idx);
+    cgpt_coarse_fill(coarse,_coarse);
 
-    fine->block_project(coarse,basis);
+    fine->block_project(coarse,basis,ac != 0);
 
     return PyLong_FromLong(0);
   });
 
 EXPORT(block_promote,{
 
-    PyObject* _basis;
-    void* _coarse,* _fine;
+    PyObject* _basis,* _coarse;
+    void* _fine;
     int idx;
-    if (!PyArg_ParseTuple(args, "llOi", &_coarse,&_fine,&_basis,&idx)) {
+    if (!PyArg_ParseTuple(args, "OlOi", &_coarse,&_fine,&_basis,&idx)) {
       return NULL;
     }
 
     cgpt_Lattice_base* fine = (cgpt_Lattice_base*)_fine;
-    cgpt_Lattice_base* coarse = (cgpt_Lattice_base*)_coarse;
 
-    std::vector<cgpt_Lattice_base*> basis;
+    std::vector<cgpt_Lattice_base*> basis, coarse;
     cgpt_basis_fill(basis,_basis,idx);
+    cgpt_coarse_fill(coarse,_coarse);
 
     fine->block_promote(coarse,basis);
 
     return PyLong_FromLong(0);
   });
 
+EXPORT(block_project_compressed,{
+
+    PyObject* _basis,* _coarse;
+    void* _fine;
+    int idx, ac;
+    if (!PyArg_ParseTuple(args, "OlOii", &_coarse,&_fine,&_basis,&idx,&ac)) {
+      return NULL;
+    }
+
+    cgpt_Lattice_base* fine = (cgpt_Lattice_base*)_fine;
+
+    std::vector<cgpt_compressed*> basis;
+    std::vector<cgpt_Lattice_base*> coarse;
+    cgpt_compressed_fill(basis,_basis,idx);
+    cgpt_coarse_fill(coarse,_coarse);
+
+    fine->block_project_compressed(coarse,basis,ac != 0);
+
+    return PyLong_FromLong(0);
+  });
+
+EXPORT(block_promote_compressed,{
+
+    PyObject* _basis,* _coarse;
+    void* _fine;
+    int idx;
+    if (!PyArg_ParseTuple(args, "OlOi", &_coarse,&_fine,&_basis,&idx)) {
+      return NULL;
+    }
+
+    cgpt_Lattice_base* fine = (cgpt_Lattice_base*)_fine;
+
+    std::vector<cgpt_compressed*> basis;
+    std::vector<cgpt_Lattice_base*> coarse;
+    cgpt_compressed_fill(basis,_basis,idx);
+    cgpt_coarse_fill(coarse,_coarse);
+
+    fine->block_promote_compressed(coarse,basis);
+
+    return PyLong_FromLong(0);
+  });
+
 EXPORT(block_orthonormalize,{
 
     PyObject* _basis;
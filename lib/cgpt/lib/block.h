@@ -209,35 +209,6 @@ template<class vobj,class vobj2,class CComplex>
   return;
 }
 
-template<class vobj,class CComplex,int nbasis>
-  inline void cgpt_blockProject(Lattice<iVector<CComplex,nbasis > > &coarseData,
-			   const             Lattice<vobj>   &fineData,
-			   const std::vector<Lattice<vobj>* > &Basis)
-{
-  GridBase * fine  = fineData.Grid();
-  GridBase * coarse= coarseData.Grid();
-
-  Lattice<iScalar<CComplex>> ip(coarse);
-  Lattice<vobj>     fineDataRed = fineData;
-
-  //  auto fineData_   = fineData.View();
-  auto coarseData_ = coarseData.View();
-  auto ip_         = ip.View();
-  for(int v=0;v<nbasis;v++) {
-    cgpt_blockInnerProductD(ip,*Basis[v],fineDataRed); // ip = <basis|fine>
-    accelerator_for( sc, coarse->oSites(), vobj::Nsimd(), {
-	coalescedWrite(coarseData_[sc](v),TensorRemove(ip_(sc)));
-      });
-
-    // needed for numerical stability (crucial at single precision)
-    // |fine> = |fine> - <basis|fine> |basis>
-    ip=-ip;
-    cgpt_blockZAXPY(fineDataRed,ip,*Basis[v],fineDataRed); 
-
-  }
-}
-
-
 template<class vobj,class CComplex>
   inline void cgpt_blockNormalise(Lattice<CComplex> &ip,Lattice<vobj> &fineX)
 {
@@ -273,60 +244,239 @@ template<class vobj,class CComplex>
   }
 }
 
-template<class vobj,class CComplex,int nbasis>
-  inline void cgpt_blockPromote(const Lattice<iVector<CComplex,nbasis > > &coarseData,
-			   Lattice<vobj>   &fineData,
-			   const std::vector<Lattice<vobj>* > &Basis)
-{
+// Coarse vectors given by their raw storage, coarse[k] holds the
+// components coarse_n0[k] ... coarse_n0[k] + coarse_n[k] - 1 of the basis
+template<class vobj>
+class cgpt_coarse_storage {
+public:
+  typedef typename vobj::vector_type CComplex;
+  std::vector<CComplex*> data;
+  std::vector<int> n, k_of, i_of;
+  GridBase* grid;
+
+  cgpt_coarse_storage(std::vector<cgpt_Lattice_base*>& coarse) {
+    grid = coarse[0]->get_grid();
+    for (size_t k=0;k<coarse.size();k++) {
+      long Nsimd, word, simd_word;
+      std::vector<long> ishape;
+      coarse[k]->describe_data_layout(Nsimd,word,simd_word,ishape);
+      ASSERT(Nsimd == vobj::Nsimd() && simd_word * Nsimd == sizeof(CComplex));
+      ASSERT(coarse[k]->get_grid() == grid);
+      PyObject* _mem = coarse[k]->memory_view();
+      data.push_back((CComplex*)PyMemoryView_GET_BUFFER(_mem)->buf);
+      Py_DECREF(_mem);
+      n.push_back((int)(word / simd_word));
+      for (int i=0;i<n.back();i++) {
+	k_of.push_back((int)k);
+	i_of.push_back(i);
+      }
+    }
+  }
+
+  CComplex& operator()(int64_t sc, int v) {
+    int k = k_of[v];
+    return data[k][sc*n[k] + i_of[v]];
+  }
+
+  int size() {
+    return (int)k_of.size();
+  }
+};
+
+// Basis vectors of the fused block kernels, basis(v,sf) is the outer site
+// sf of basis vector v
+template<class vobj>
+class cgpt_lattice_basis_view {
+public:
+  typedef decltype(std::declval<Lattice<vobj>&>().View()) View;
+  std::vector<View> v;
+
+  cgpt_lattice_basis_view(const std::vector<Lattice<vobj>* >& Basis) {
+    for (auto b : Basis)
+      v.push_back(b->View());
+  }
+
+  inline const vobj& operator()(int i, int64_t sf) const {
+    return v[i][sf];
+  }
+
+  int size() const {
+    return (int)v.size();
+  }
+};
+
+// compressed basis vectors are decompressed site by site, the projection
+// reads each site of a block twice while the block is in cache
+template<class vobj>
+class cgpt_compressed_basis_view {
+public:
+  typedef typename vobj::scalar_type Coeff_t;
+  std::vector<cgpt_compressed*> c;
+
+  cgpt_compressed_basis_view(const std::vector<cgpt_compressed*>& _c, GridBase* grid) : c(_c) {
+    for (auto x : c) {
+      ASSERT(x->grid == grid && x->Nsimd == vobj::Nsimd() && x->simd_word == sizeof(Coeff_t) &&
+	     x->words * x->Nsimd * x->simd_word == sizeof(vobj));
+    }
+  }
+
+  inline vobj operator()(int i, int64_t sf) const {
+    vobj r;
+    Coeff_t* d = (Coeff_t*)&r;
+    const cgpt_compressed& x = *c[i];
+    for (long lane=0;lane<x.Nsimd;lane++) {
+      RealD s = x.scale[sf*x.Nsimd + lane];
+      for (long w=0;w<x.words;w++) {
+	const int16_t* m = &x.mantissa[2*((sf*x.words + w)*x.Nsimd + lane)];
+	d[w*x.Nsimd + lane] = Coeff_t(s * m[0], s * m[1]);
+      }
+    }
+    return r;
+  }
+
+  int size() const {
+    return (int)c.size();
+  }
+};
+
+// coarse(v) (+)= <basis[v]|fine> on each block, all basis vectors are
+// handled in a single sweep over the fine grid; for numerical stability
+// each projection is removed from a block-local copy of fine before the
+// next one is computed
+template<class vobj, class BasisView>
+void cgpt_block_project_fused(cgpt_coarse_storage<vobj>& coarseData,
+			      const Lattice<vobj> &fineData,
+			      const BasisView &basis_v,
+			      bool ac) {
+  typedef typename vobj::vector_type CComplex;
   GridBase * fine  = fineData.Grid();
-  GridBase * coarse= coarseData.Grid();
+  GridBase * coarse= coarseData.grid;
 
-  //Lattice<typename vobj::DoublePrecision2> fineDataD(fine);
+  subdivides(coarse,fine);
+  int nbasis = basis_v.size();
+  ASSERT(coarseData.size() == nbasis);
 
-  //fineDataD=Zero();
-  fineData=Zero();
-  for(int i=0;i<nbasis;i++) {
-    Lattice<iScalar<CComplex> > ip = PeekIndex<0>(coarseData,i);
-    auto  ip_ =  ip.View();
-    cgpt_blockZAXPY(fineData,ip,*Basis[i],fineData);
-    // cgpt_blockZAXPY(fineDataD,ip,*Basis[i],fineDataD);
+  int _ndimension = coarse->_ndimension;
+  Coordinate block_r(_ndimension);
+  for(int d=0 ; d<_ndimension;d++)
+    block_r[d] = fine->_rdimensions[d] / coarse->_rdimensions[d];
+  int blockVol = fine->oSites()/coarse->oSites();
+
+  auto fine_v = fineData.View();
+
+  thread_region
+  {
+    std::vector<vobj,alignedAllocator<vobj> > red(blockVol); // Thread private
+    std::vector<int> sf_of(blockVol);
+    Coordinate coor_c(_ndimension), coor_b(_ndimension), coor_f(_ndimension);
+    thread_for_in_region(sc, coarse->oSites(), {
+	Lexicographic::CoorFromIndex(coor_c,sc,coarse->_rdimensions);
+	for (int sb=0;sb<blockVol;sb++) {
+	  int sf;
+	  Lexicographic::CoorFromIndex(coor_b,sb,block_r);
+	  for(int d=0;d<_ndimension;d++) coor_f[d]=coor_c[d]*block_r[d] + coor_b[d];
+	  Lexicographic::IndexFromCoor(coor_f,sf,fine->_rdimensions);
+	  sf_of[sb] = sf;
+	  red[sb] = fine_v[sf];
+	}
+
+	for (int v=0;v<nbasis;v++) {
+	  auto ipD = TensorRemove(innerProductD2(basis_v(v,sf_of[0]),red[0]));
+	  for (int sb=1;sb<blockVol;sb++)
+	    ipD += TensorRemove(innerProductD2(basis_v(v,sf_of[sb]),red[sb]));
+	  CComplex ip;
+	  convertType(ip,ipD);
+	  CComplex& c = coarseData(sc,v);
+	  if (ac)
+	    c = c + ip;
+	  else
+	    c = ip;
+
+	  // |fine> = |fine> - <basis|fine> |basis> on this block
+	  typename vobj::tensor_reduced cA;
+	  convertType(cA,ip);
+	  for (int sb=0;sb<blockVol;sb++)
+	    red[sb] = red[sb] - cA * basis_v(v,sf_of[sb]);
+	}
+      });
   }
+}
+
+// fine = sum_v coarse(v) basis[v] in a single sweep over the fine grid
+template<class vobj, class BasisView>
+void cgpt_block_promote_fused(cgpt_coarse_storage<vobj>& coarseData,
+			      Lattice<vobj> &fineData,
+			      const BasisView &basis_v) {
+  GridBase * fine  = fineData.Grid();
+  GridBase * coarse= coarseData.grid;
 
-  //convertType(fineData,fineDataD);
+  subdivides(coarse,fine);
+  int nbasis = basis_v.size();
+  ASSERT(coarseData.size() == nbasis);
+
+  int _ndimension = coarse->_ndimension;
+  Coordinate block_r(_ndimension);
+  for(int d=0 ; d<_ndimension;d++)
+    block_r[d] = fine->_rdimensions[d] / coarse->_rdimensions[d];
+
+  auto fine_v = fineData.View();
+
+  thread_region
+  {
+    Coordinate coor_c(_ndimension), coor_f(_ndimension);
+    thread_for_in_region(sf, fine->oSites(), {
+	int sc;
+	Lexicographic::CoorFromIndex(coor_f,sf,fine->_rdimensions);
+	for(int d=0;d<_ndimension;d++) coor_c[d]=coor_f[d]/block_r[d];
+	Lexicographic::IndexFromCoor(coor_c,sc,coarse->_rdimensions);
+
+	vobj r = Zero();
+	for (int v=0;v<nbasis;v++) {
+	  typename vobj::tensor_reduced cA;
+	  convertType(cA,coarseData(sc,v));
+	  r = r + cA * basis_v(v,sf);
+	}
+	fine_v[sf] = r;
+      });
+  }
 }
 
 template<typename T>
-void cgpt_block_project(cgpt_Lattice_base* _coarse, Lattice<T>& fine, std::vector<cgpt_Lattice_base*>& _basis) {
-
-  typedef typename Lattice<T>::vector_type vCoeff_t;
+void cgpt_block_project(std::vector<cgpt_Lattice_base*>& _coarse, Lattice<T>& fine, std::vector<cgpt_Lattice_base*>& _basis, bool ac) {
 
   std::vector< Lattice<T>* > basis(_basis.size());
   for (long i=0;i<_basis.size();i++)
     basis[i] = &compatible<T>(_basis[i])->l;
 
-#define BASIS_SIZE(n) if (n == basis.size()) { cgpt_blockProject(compatible< iComplexV ## n<vCoeff_t> >(_coarse)->l,fine,basis); } else
-#include "basis_size.h"
-#undef BASIS_SIZE
-  { ERR("Unknown basis size %d",(int)basis.size()); }
-
+  cgpt_coarse_storage<T> coarse(_coarse);
+  cgpt_block_project_fused(coarse,fine,cgpt_lattice_basis_view<T>(basis),ac);
 }
 
+template<typename T>
+void cgpt_block_project(std::vector<cgpt_Lattice_base*>& _coarse, Lattice<T>& fine, std::vector<cgpt_compressed*>& basis, bool ac) {
 
+  cgpt_coarse_storage<T> coarse(_coarse);
+  cgpt_block_project_fused(coarse,fine,cgpt_compressed_basis_view<T>(basis,fine.Grid()),ac);
+}
 
 template<typename T>
-void cgpt_block_promote(cgpt_Lattice_base* _coarse, Lattice<T>& fine, std::vector<cgpt_Lattice_base*>& _basis) {
-
-  typedef typename Lattice<T>::vector_type vCoeff_t;
+void cgpt_block_promote(std::vector<cgpt_Lattice_base*>& _coarse, Lattice<T>& fine, std::vector<cgpt_Lattice_base*>& _basis) {
 
   std::vector< Lattice<T>* > basis(_basis.size());
   for (long i=0;i<_basis.size();i++)
     basis[i] = &compatible<T>(_basis[i])->l;
 
-#define BASIS_SIZE(n) if (n == basis.size()) { cgpt_blockPromote(compatible< iComplexV ## n<vCoeff_t> >(_coarse)->l,fine,basis); } else
-#include "basis_size.h"
-#undef BASIS_SIZE
-  { ERR("Unknown basis size %d",(int)basis.size()); }
+  cgpt_coarse_storage<T> coarse(_coarse);
+  fine.Checkerboard() = basis[0]->Checkerboard();
+  cgpt_block_promote_fused(coarse,fine,cgpt_lattice_basis_view<T>(basis));
+}
+
+// the checkerboard of a compressed basis is kept on the python side
+template<typename T>
+void cgpt_block_promote(std::vector<cgpt_Lattice_base*>& _coarse, Lattice<T>& fine, std::vector<cgpt_compressed*>& basis) {
 
+  cgpt_coarse_storage<T> coarse(_coarse);
+  cgpt_block_promote_fused(coarse,fine,cgpt_compressed_basis_view<T>(basis,fine.Grid()));
 }
 
 template<typename T>
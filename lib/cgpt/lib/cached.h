@@ -16,6 +16,18 @@
     with this program; if not, write to the Free Software Foundation, Inc.,
     51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 */
+// Statistics of all grid_cached objects
+struct grid_cached_statistics {
+  long hits = 0;      // filled cache found on an immutable array
+  long misses = 0;    // cache attached to an immutable array or refreshed for a new grid
+  long uncached = 0;  // mutable array, data cannot be cached
+};
+
+inline grid_cached_statistics& grid_cached_stats() {
+  static grid_cached_statistics stats;
+  return stats;
+}
+
 template<typename T>
 class grid_cached {
  protected:
@@ -52,8 +64,10 @@ class grid_cached {
 	    PyCapsule_SetPointer(base,_data);
 	    PyCapsule_SetContext(base,grid);
 	    _filled = false;
+	    grid_cached_stats().misses++;
 	  } else { // use cache
 	    _filled = true;
+	    grid_cached_stats().hits++;
 	  }
 	  return;
 	}
@@ -64,12 +78,14 @@ class grid_cached {
 	PyObject* cap = PyCapsule_New(_data,tag,capsule_destructor);
 	PyCapsule_SetContext(cap,grid);
 	PyArray_SetBaseObject(a,cap);
+	grid_cached_stats().misses++;
 	return;
       }
 
     }
 
     // cannot cache
+    grid_cached_stats().uncached++;
     _filled = false;
     _own_data = true;
     _data = new T();
@@ -0,0 +1,261 @@
+/*
+    GPT - Grid Python Toolkit
+    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+*/
+#include "lib.h"
+
+static void cgpt_compressed_layout(cgpt_Lattice_base* l, long& osites, long& words, long& Nsimd, long& simd_word, void*& data) {
+  long word;
+  std::vector<long> ishape;
+  l->describe_data_layout(Nsimd,word,simd_word,ishape);
+  words = word / simd_word;
+  osites = l->get_grid()->oSites();
+  PyObject* _mem = l->memory_view();
+  Py_buffer* buf = PyMemoryView_GET_BUFFER(_mem);
+  data = buf->buf;
+  ASSERT(buf->len == osites * words * Nsimd * simd_word);
+  Py_DECREF(_mem);
+}
+
+template<typename Coeff_t>
+void cgpt_compress(cgpt_compressed& c, const Coeff_t* src) {
+  long words = c.words, Nsimd = c.Nsimd;
+  thread_for(o, c.osites, {
+      for (long lane=0;lane<Nsimd;lane++) {
+	RealD amax = 0.0;
+	for (long w=0;w<words;w++) {
+	  const Coeff_t& v = src[(o*words + w)*Nsimd + lane];
+	  amax = std::max(amax,(RealD)std::max(std::abs(v.real()),std::abs(v.imag())));
+	}
+	RealD s = amax / 32767.0;
+	RealD is = (s == 0.0) ? 0.0 : 1.0 / s;
+	c.scale[o*Nsimd + lane] = (float)s;
+	for (long w=0;w<words;w++) {
+	  const Coeff_t& v = src[(o*words + w)*Nsimd + lane];
+	  int16_t* m = &c.mantissa[2*((o*words + w)*Nsimd + lane)];
+	  m[0] = (int16_t)std::round(v.real() * is);
+	  m[1] = (int16_t)std::round(v.imag() * is);
+	}
+      }
+    });
+}
+
+template<typename Coeff_t>
+void cgpt_decompress(const cgpt_compressed& c, Coeff_t* dst) {
+  long words = c.words, Nsimd = c.Nsimd;
+  thread_for(o, c.osites, {
+      for (long lane=0;lane<Nsimd;lane++) {
+	RealD s = c.scale[o*Nsimd + lane];
+	for (long w=0;w<words;w++) {
+	  const int16_t* m = &c.mantissa[2*((o*words + w)*Nsimd + lane)];
+	  dst[(o*words + w)*Nsimd + lane] = Coeff_t(s * m[0], s * m[1]);
+	}
+      }
+    });
+}
+
+// dst = sum_k Qt[k] basis[k], decompressed per site
+template<typename Coeff_t>
+void cgpt_compressed_linear_combination(std::vector<cgpt_compressed*>& basis, const RealD* Qt, Coeff_t* dst,
+					long osites, long words, long Nsimd) {
+  long n = (long)basis.size();
+  thread_region
+  {
+    std::vector<ComplexD> v(words), r(words);
+    thread_for_in_region(o, osites, {
+	for (long lane=0;lane<Nsimd;lane++) {
+	  for (long w=0;w<words;w++)
+	    r[w] = 0.0;
+	  for (long k=0;k<n;k++) {
+	    if (Qt[k] == 0.0)
+	      continue;
+	    basis[k]->load(o,lane,&v[0]);
+	    for (long w=0;w<words;w++)
+	      r[w] += Qt[k] * v[w];
+	  }
+	  for (long w=0;w<words;w++)
+	    dst[(o*words + w)*Nsimd + lane] = Coeff_t(r[w].real(), r[w].imag());
+	}
+      });
+  }
+}
+
+// basis[j] = sum_k Qt[j,k] basis[k] for j0 <= j < j1 and k0 <= k < k1,
+// all inputs of a site are decompressed before its outputs are compressed,
+// so the rotation is done in place without lattice temporaries
+static void cgpt_compressed_rotate(std::vector<cgpt_compressed*>& basis, const RealD* Qt,
+				   int j0, int j1, int k0, int k1, int Nm) {
+  long osites = basis[0]->osites, words = basis[0]->words, Nsimd = basis[0]->Nsimd;
+  thread_region
+  {
+    std::vector<ComplexD> v((k1 - k0) * words), r((j1 - j0) * words);
+    thread_for_in_region(o, osites, {
+	for (long lane=0;lane<Nsimd;lane++) {
+	  for (int k=k0;k<k1;k++)
+	    basis[k]->load(o,lane,&v[(k - k0)*words]);
+	  for (int j=j0;j<j1;j++) {
+	    ComplexD* rj = &r[(j - j0)*words];
+	    for (long w=0;w<words;w++)
+	      rj[w] = 0.0;
+	    for (int k=k0;k<k1;k++) {
+	      RealD q = Qt[k + Nm*j];
+	      const ComplexD* vk = &v[(k - k0)*words];
+	      for (long w=0;w<words;w++)
+		rj[w] += q * vk[w];
+	    }
+	  }
+	  for (int j=j0;j<j1;j++)
+	    basis[j]->store(o,lane,&r[(j - j0)*words]);
+	}
+      });
+  }
+}
+
+EXPORT(create_compressed,{
+
+    void* _src;
+    if (!PyArg_ParseTuple(args, "l", &_src)) {
+      return NULL;
+    }
+
+    cgpt_Lattice_base* src = (cgpt_Lattice_base*)_src;
+    cgpt_compressed* c = new cgpt_compressed();
+    void* data;
+    cgpt_compressed_layout(src,c->osites,c->words,c->Nsimd,c->simd_word,data);
+    c->grid = src->get_grid();
+    c->mantissa.resize(2 * c->osites * c->words * c->Nsimd);
+    c->scale.resize(c->osites * c->Nsimd);
+
+    if (c->simd_word == sizeof(ComplexF)) {
+      cgpt_compress(*c,(ComplexF*)data);
+    } else if (c->simd_word == sizeof(ComplexD)) {
+      cgpt_compress(*c,(ComplexD*)data);
+    } else {
+      ERR("Unsupported word size %ld", c->simd_word);
+    }
+
+    return PyLong_FromVoidPtr(c);
+  });
+
+EXPORT(delete_compressed,{
+
+    void* p;
+    if (!PyArg_ParseTuple(args, "l", &p)) {
+      return NULL;
+    }
+
+    delete ((cgpt_compressed*)p);
+    return PyLong_FromLong(0);
+  });
+
+EXPORT(decompress,{
+
+    void* _c,* _dst;
+    if (!PyArg_ParseTuple(args, "ll", &_c, &_dst)) {
+      return NULL;
+    }
+
+    cgpt_compressed* c = (cgpt_compressed*)_c;
+    cgpt_Lattice_base* dst = (cgpt_Lattice_base*)_dst;
+    long osites, words, Nsimd, simd_word;
+    void* data;
+    cgpt_compressed_layout(dst,osites,words,Nsimd,simd_word,data);
+    ASSERT(dst->get_grid() == c->grid);
+    ASSERT(osites == c->osites && words == c->words && Nsimd == c->Nsimd && simd_word == c->simd_word);
+
+    if (simd_word == sizeof(ComplexF)) {
+      cgpt_decompress(*c,(ComplexF*)data);
+    } else {
+      cgpt_decompress(*c,(ComplexD*)data);
+    }
+
+    return PyLong_FromLong(0);
+  });
+
+EXPORT(compressed_nbytes,{
+
+    void* p;
+    if (!PyArg_ParseTuple(args, "l", &p)) {
+      return NULL;
+    }
+
+    cgpt_compressed* c = (cgpt_compressed*)p;
+    return PyLong_FromLong((long)(c->mantissa.size() * sizeof(int16_t) + c->scale.size() * sizeof(float)));
+  });
+
+EXPORT(compressed_linear_combination,{
+
+    PyObject* _basis,* _Qt;
+    void* _dst;
+    int idx;
+    if (!PyArg_ParseTuple(args, "lOOi", &_dst, &_basis, &_Qt, &idx)) {
+      return NULL;
+    }
+
+    std::vector<cgpt_compressed*> basis;
+    cgpt_compressed_fill(basis,_basis,idx);
+
+    cgpt_Lattice_base* dst = (cgpt_Lattice_base*)_dst;
+    long osites, words, Nsimd, simd_word;
+    void* data;
+    cgpt_compressed_layout(dst,osites,words,Nsimd,simd_word,data);
+    for (auto c : basis) {
+      ASSERT(dst->get_grid() == c->grid);
+      ASSERT(osites == c->osites && words == c->words && Nsimd == c->Nsimd && simd_word == c->simd_word);
+    }
+
+    RealD* Qt;
+    int Nm;
+    cgpt_numpy_import_vector(_Qt,Qt,Nm);
+    ASSERT(Nm >= (int)basis.size());
+
+    if (simd_word == sizeof(ComplexF)) {
+      cgpt_compressed_linear_combination(basis,Qt,(ComplexF*)data,osites,words,Nsimd);
+    } else {
+      cgpt_compressed_linear_combination(basis,Qt,(ComplexD*)data,osites,words,Nsimd);
+    }
+
+    return PyLong_FromLong(0);
+  });
+
+EXPORT(compressed_rotate,{
+
+    PyObject* _basis,* _Qt;
+    int j0,j1,k0,k1,idx;
+    if (!PyArg_ParseTuple(args, "OOiiiii", &_basis, &_Qt, &j0, &j1, &k0, &k1, &idx)) {
+      return NULL;
+    }
+
+    std::vector<cgpt_compressed*> basis;
+    cgpt_compressed_fill(basis,_basis,idx);
+
+    ASSERT(basis.size() > 0);
+    for (auto c : basis) {
+      ASSERT(c->grid == basis[0]->grid && c->words == basis[0]->words && c->Nsimd == basis[0]->Nsimd);
+    }
+
+    RealD* Qt;
+    int Nm;
+    cgpt_numpy_import_matrix(_Qt,Qt,Nm);
+
+    ASSERT(j0 <= j1 && k0 <= k1 && j0 >=0 && k0 >= 0 && k1 <= Nm && j1 <= Nm &&
+	   (int)basis.size() >= j1 && (int)basis.size() >= k1);
+
+    cgpt_compressed_rotate(basis,Qt,j0,j1,k0,k1,Nm);
+
+    return PyLong_FromLong(0);
+  });
@@ -0,0 +1,70 @@
+/*
+    GPT - Grid Python Toolkit
+    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+*/
+
+// Compressed storage of lattices
+//
+//  Block floating point with 16 bit mantissas: for every site and SIMD lane
+//  the real and imaginary parts of all words share a single scale.  Data is
+//  compressed from and decompressed to lattices of single or double precision.
+//  Kernels that take compressed operands decompress them site by site.
+struct cgpt_compressed {
+  std::vector<int16_t> mantissa; // [osite][word][lane][re,im]
+  std::vector<float> scale;      // [osite][lane]
+  long osites, words, Nsimd, simd_word;
+  GridBase* grid;
+
+  // all words of outer site o and lane, v[w] for 0 <= w < words
+  inline void load(long o, long lane, ComplexD* v) const {
+    RealD s = scale[o*Nsimd + lane];
+    for (long w=0;w<words;w++) {
+      const int16_t* m = &mantissa[2*((o*words + w)*Nsimd + lane)];
+      v[w] = ComplexD(s * m[0], s * m[1]);
+    }
+  }
+
+  inline void store(long o, long lane, const ComplexD* v) {
+    RealD amax = 0.0;
+    for (long w=0;w<words;w++)
+      amax = std::max(amax,std::max(std::abs(v[w].real()),std::abs(v[w].imag())));
+    RealD s = amax / 32767.0;
+    RealD is = (s == 0.0) ? 0.0 : 1.0 / s;
+    scale[o*Nsimd + lane] = (float)s;
+    for (long w=0;w<words;w++) {
+      int16_t* m = &mantissa[2*((o*words + w)*Nsimd + lane)];
+      m[0] = (int16_t)std::round(v[w].real() * is);
+      m[1] = (int16_t)std::round(v[w].imag() * is);
+    }
+  }
+};
+
+static void cgpt_compressed_fill(std::vector<cgpt_compressed*>& basis, PyObject* _basis, int idx) {
+  ASSERT(PyList_Check(_basis));
+  Py_ssize_t size = PyList_Size(_basis);
+  basis.resize(size);
+  for (Py_ssize_t i=0;i<size;i++) {
+    PyObject* li = PyList_GetItem(_basis,i);
+    PyObject* v_obj = PyObject_GetAttrString(li,"v_obj");
+    ASSERT(v_obj && PyList_Check(v_obj));
+    ASSERT(idx >= 0 && idx < PyList_Size(v_obj));
+    PyObject* obj = PyList_GetItem(v_obj,idx);
+    ASSERT(PyLong_Check(obj));
+    basis[i] = (cgpt_compressed*)PyLong_AsVoidPtr(obj);
+    Py_DECREF(v_obj);
+  }
+}
@@ -111,3 +111,10 @@ EXPORT(mview,{
     return NULL;
 
   });
+
+EXPORT(grid_cached_stats,{
+
+    grid_cached_statistics& s = grid_cached_stats();
+    return Py_BuildValue("{s:l,s:l,s:l}","hits",s.hits,"misses",s.misses,"uncached",s.uncached);
+
+  });
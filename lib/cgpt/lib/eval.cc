@@ -18,6 +18,8 @@
 */
 #include "lib.h"
 
+cgpt_reduction* cgpt_active_reduction = 0;
+
 struct _eval_factor_ {
   enum { LATTICE, ARRAY, GAMMA } type;
   int unary;
@@ -28,6 +30,7 @@ struct _eval_factor_ {
 
   Gamma::Algebra gamma;
   std::string otype;
+  int slot; // operand slot for factors of an eval plan
 
   void release() {
     if (type == LATTICE) {
@@ -163,6 +166,25 @@ cgpt_Lattice_base* eval_term(std::vector<_eval_factor_>& factors, int term_unary
   return factors[0].lattice;
 }
 
+// compatible_linear_combination is hard-coded for at most this many terms
+#define EVAL_MAX_LINEAR_COMBINATION 7
+
+cgpt_Lattice_base* eval_linear_combination(cgpt_Lattice_base* dst, bool ac, std::vector<cgpt_lattice_term>& terms, int unary_factor, int unary_expr) {
+
+  if (terms.size() <= EVAL_MAX_LINEAR_COMBINATION)
+    return terms[0].get_lat()->compatible_linear_combination(dst,ac, terms, unary_factor, unary_expr);
+
+  // unary operators are linear, so larger combinations can be accumulated in chunks
+  for (size_t i=0;i<terms.size();i+=EVAL_MAX_LINEAR_COMBINATION) {
+    size_t j = std::min(terms.size(), i + EVAL_MAX_LINEAR_COMBINATION);
+    std::vector<cgpt_lattice_term> chunk(terms.begin() + i, terms.begin() + j);
+    dst = chunk[0].get_lat()->compatible_linear_combination(dst,ac, chunk, unary_factor, unary_expr);
+    ac=true;
+  }
+
+  return dst;
+}
+
 cgpt_Lattice_base* eval_general(cgpt_Lattice_base* dst, std::vector<_eval_term_>& terms,int unary,bool ac) {
 
   // class A)
@@ -173,7 +195,8 @@ cgpt_Lattice_base* eval_general(cgpt_Lattice_base* dst, std::vector<_eval_term_>
   // for all other terms, create terms and apply unary operators before summing
   //   result_class_b = unary(B*C*D) + unary(E*F)
 
-  std::vector< cgpt_lattice_term > terms_a[NUM_FACTOR_UNARY], terms_b;
+  std::vector< cgpt_lattice_term > terms_a[NUM_FACTOR_UNARY];
+  std::vector< _eval_term_* > terms_b;
 
   for (size_t i=0;i<terms.size();i++) {
     auto& term = terms[i];
@@ -184,24 +207,30 @@ cgpt_Lattice_base* eval_general(cgpt_Lattice_base* dst, std::vector<_eval_term_>
       ASSERT(factor.unary >= 0 && factor.unary < NUM_FACTOR_UNARY);
       terms_a[factor.unary].push_back( cgpt_lattice_term( term.coefficient, factor.lattice, false ) );
     } else {
-      terms_b.push_back( cgpt_lattice_term( term.coefficient, eval_term(term.factors, unary), true ) );
+      terms_b.push_back(&term);
     }
   }
 
   for (int j=0;j<NUM_FACTOR_UNARY;j++) {
     if (terms_a[j].size() > 0) {
-      dst = terms_a[j][0].get_lat()->compatible_linear_combination(dst,ac, terms_a[j], j, unary);
+      dst = eval_linear_combination(dst,ac, terms_a[j], j, unary);
       ac=true;
     }
   }
 
-  if (terms_b.size() > 0) {
-    dst = terms_b[0].get_lat()->compatible_linear_combination(dst,ac, terms_b, 0, 0); // unary operators have been applied above
+  // products are evaluated and accumulated in chunks, so at most
+  // EVAL_MAX_LINEAR_COMBINATION of their temporaries are alive at a time
+  for (size_t i=0;i<terms_b.size();i+=EVAL_MAX_LINEAR_COMBINATION) {
+    size_t j = std::min(terms_b.size(), i + EVAL_MAX_LINEAR_COMBINATION);
+    std::vector< cgpt_lattice_term > chunk;
+    for (size_t k=i;k<j;k++)
+      chunk.push_back( cgpt_lattice_term( terms_b[k]->coefficient, eval_term(terms_b[k]->factors, unary), true ) );
+    dst = eval_linear_combination(dst,ac, chunk, 0, 0); // unary operators have been applied above
+    ac=true;
+    for (auto& term : chunk)
+      term.release();
   }
 
-  for (auto& term : terms_b)
-    term.release();
-
   return dst;
 }
 
@@ -264,3 +293,320 @@ EXPORT(eval,{
     return PyLong_FromLong(0);
     
   });
+
+// Evaluation plans
+//
+//  The structure of an expression (factor types, otypes, unary flags, gamma
+//  matrices) is converted and simplified only once.  Executing a plan
+//  merely binds the current operands and coefficients.
+struct _eval_plan_ {
+  std::vector<_eval_term_> terms;
+  int unary;
+};
+
+static void eval_plan_convert_structure(PyObject* _list, _eval_plan_& plan) {
+  ASSERT(PyList_Check(_list));
+  int n = (int)PyList_Size(_list);
+  int slot = 0;
+
+  plan.terms.resize(n);
+  for (int i=0;i<n;i++) {
+    auto& term = plan.terms[i];
+    PyObject* ll = PyList_GetItem(_list,i);
+    ASSERT(PyList_Check(ll));
+    int m = (int)PyList_Size(ll);
+
+    term.coefficient = 0.0;
+    term.factors.resize(m);
+    for (int j=0;j<m;j++) {
+      auto& factor = term.factors[j];
+      PyObject* jj = PyList_GetItem(ll,j);
+      ASSERT(PyTuple_Check(jj) && PyTuple_Size(jj) == 3);
+
+      factor.unary = PyLong_AsLong(PyTuple_GetItem(jj,0));
+      int kind = (int)PyLong_AsLong(PyTuple_GetItem(jj,1));
+      PyObject* payload = PyTuple_GetItem(jj,2);
+      factor.lattice = 0;
+      factor.slot = -1;
+      if (kind == 0) {
+	factor.type = _eval_factor_::LATTICE;
+	factor.slot = slot++;
+      } else if (kind == 1) {
+	factor.type = _eval_factor_::ARRAY;
+	cgpt_convert(payload,factor.otype);
+	factor.slot = slot++;
+      } else if (kind == 3) {
+	// shifted lattice, the operand is the shifted copy prepared by python
+	ASSERT(PyTuple_Check(payload) && PyTuple_Size(payload) == 3);
+	factor.type = _eval_factor_::LATTICE;
+	factor.slot = slot++;
+      } else if (kind == 2) {
+	int gamma = (int)PyLong_AsLong(payload);
+	ASSERT(gamma >= 0 && gamma < gamma_algebra_map_max);
+	factor.gamma = gamma_algebra_map[gamma];
+	factor.type = _eval_factor_::GAMMA;
+      } else {
+	ASSERT(0);
+      }
+    }
+  }
+
+  simplify(plan.terms);
+}
+
+static void eval_plan_bind(_eval_plan_& plan, std::vector<_eval_term_>& terms,
+			   PyObject* _operands, PyObject* _coefficients, int idx) {
+  ASSERT(PyList_Check(_operands) && PyList_Check(_coefficients));
+  ASSERT(PyList_Size(_coefficients) == (long)plan.terms.size());
+
+  terms = plan.terms;
+  for (size_t i=0;i<terms.size();i++) {
+    auto& term = terms[i];
+    cgpt_convert(PyList_GetItem(_coefficients,i),term.coefficient);
+    for (auto& factor : term.factors) {
+      if (factor.type == _eval_factor_::LATTICE) {
+	PyObject* v_obj = PyList_GetItem(_operands,factor.slot);
+	ASSERT(v_obj && PyList_Check(v_obj));
+	ASSERT(idx < PyList_Size(v_obj) && idx >= 0);
+	factor.lattice = (cgpt_Lattice_base*)PyLong_AsVoidPtr(PyList_GetItem(v_obj,idx));
+      } else if (factor.type == _eval_factor_::ARRAY) {
+	PyObject* array = PyList_GetItem(_operands,factor.slot);
+	ASSERT(array && PyArray_Check(array));
+	factor.array = (PyArrayObject*)array; // borrowed, kept alive by the operand list
+      }
+    }
+  }
+}
+
+EXPORT(create_eval_plan,{
+
+    PyObject* _list;
+    int unary;
+    if (!PyArg_ParseTuple(args, "Oi", &_list, &unary)) {
+      return NULL;
+    }
+
+    _eval_plan_* plan = new _eval_plan_();
+    plan->unary = unary;
+    eval_plan_convert_structure(_list,*plan);
+
+    return PyLong_FromVoidPtr(plan);
+  });
+
+EXPORT(delete_eval_plan,{
+
+    void* p;
+    if (!PyArg_ParseTuple(args, "l", &p)) {
+      return NULL;
+    }
+
+    delete ((_eval_plan_*)p);
+    return PyLong_FromLong(0);
+  });
+
+EXPORT(execute_eval_plan,{
+
+    void* _plan,* _dst;
+    PyObject* _operands,* _coefficients,* _ac;
+    int idx;
+    if (!PyArg_ParseTuple(args, "llOOOi", &_plan, &_dst, &_operands, &_coefficients, &_ac, &idx)) {
+      return NULL;
+    }
+
+    ASSERT(PyBool_Check(_ac));
+    bool ac;
+    cgpt_convert(_ac,ac);
+
+    _eval_plan_* plan = (_eval_plan_*)_plan;
+    cgpt_Lattice_base* dst = (cgpt_Lattice_base*)_dst;
+    bool new_lattice = dst == 0;
+    cgpt_Lattice_base* dst_orig = dst;
+
+    std::vector<_eval_term_> terms;
+    eval_plan_bind(*plan,terms,_operands,_coefficients,idx);
+
+    dst=eval_general(dst,terms,plan->unary,ac);
+
+    if (new_lattice)
+      return dst->to_decl();
+
+    assert(dst == dst_orig);
+    return PyLong_FromLong(0);
+
+  });
+
+// Fused evaluation and reduction
+//
+//  The final linear combinations and the final product of each term are
+//  not written to a lattice but accumulated directly in the reduction.
+static void eval_reduce_linear_combination(cgpt_reduction& r, std::vector<cgpt_lattice_term>& terms, int unary_factor, int unary_expr) {
+  r.coef = 1.0;
+  cgpt_reduction_scope scope(r);
+  eval_linear_combination(0, false, terms, unary_factor, unary_expr);
+}
+
+static void eval_reduce_term(cgpt_reduction& r, std::vector<_eval_factor_>& factors, int term_unary, ComplexD coef) {
+  ASSERT(factors.size() > 1);
+
+  // all but the final product are evaluated as in eval_term
+  for (size_t i = factors.size() - 1; i > 1; i--) {
+    auto& im1 = factors[i];
+    auto& im2 = factors[i-1];
+    im2 = eval_mul_factor(im2,im1,0);
+    if (i != factors.size() - 1)
+      im1.release();
+  }
+
+  {
+    r.coef = coef;
+    cgpt_reduction_scope scope(r);
+    eval_mul_factor(factors[0],factors[1],term_unary);
+  }
+
+  if (factors.size() > 2)
+    factors[1].release();
+}
+
+static void eval_reduce(cgpt_reduction& r, std::vector<_eval_term_>& terms, int unary) {
+
+  std::vector< cgpt_lattice_term > terms_a[NUM_FACTOR_UNARY];
+  std::vector< _eval_term_* > terms_b;
+  size_t n_final = 0;
+
+  for (auto& term : terms) {
+    ASSERT(term.factors.size() > 0);
+    if (term.factors.size() == 1) {
+      auto& factor = term.factors[0];
+      ASSERT(factor.type == _eval_factor_::LATTICE);
+      ASSERT(factor.unary >= 0 && factor.unary < NUM_FACTOR_UNARY);
+      terms_a[factor.unary].push_back( cgpt_lattice_term( term.coefficient, factor.lattice, false ) );
+    } else {
+      terms_b.push_back(&term);
+      n_final++;
+    }
+  }
+
+  for (int j=0;j<NUM_FACTOR_UNARY;j++)
+    n_final += (terms_a[j].size() + EVAL_MAX_LINEAR_COMBINATION - 1) / EVAL_MAX_LINEAR_COMBINATION;
+
+  if (!r.linear() && n_final > 1) {
+    // reduction does not distribute over the terms, evaluate expression first
+    std::vector< cgpt_lattice_term > t;
+    t.push_back( cgpt_lattice_term( 1.0, eval_general(0,terms,unary,false), true ) );
+    eval_reduce_linear_combination(r, t, 0, 0);
+    t[0].release();
+    return;
+  }
+
+  for (int j=0;j<NUM_FACTOR_UNARY;j++) {
+    if (terms_a[j].size() > 0)
+      eval_reduce_linear_combination(r, terms_a[j], j, unary);
+  }
+
+  for (auto term : terms_b)
+    eval_reduce_term(r, term->factors, unary, term->coefficient);
+}
+
+EXPORT(eval_reduce,{
+
+    PyObject* _plans,* _kind,* _phases;
+    int dim;
+    if (!PyArg_ParseTuple(args, "OOiO", &_plans, &_kind, &dim, &_phases)) {
+      return NULL;
+    }
+
+    std::string kind;
+    cgpt_convert(_kind,kind);
+
+    ASSERT(PyList_Check(_plans));
+    int nplans = (int)PyList_Size(_plans);
+
+    // reductions of all plans and all components share a single global sum
+    std::vector< std::vector<cgpt_reduction> > r(nplans);
+    for (int iplan=0;iplan<nplans;iplan++) {
+
+      void* _plan;
+      PyObject* _operands,* _coefficients,* _ref;
+      int n;
+      if (!PyArg_ParseTuple(PyList_GetItem(_plans,iplan), "lOOOi", &_plan, &_operands, &_coefficients, &_ref, &n)) {
+	return NULL;
+      }
+
+      _eval_plan_* plan = (_eval_plan_*)_plan;
+
+      for (int idx=0;idx<n;idx++) {
+	cgpt_Lattice_base* ref = 0;
+	if (_ref != Py_None) {
+	  ASSERT(PyList_Check(_ref) && idx < PyList_Size(_ref));
+	  ref = (cgpt_Lattice_base*)PyLong_AsVoidPtr(PyList_GetItem(_ref,idx));
+	}
+	r[iplan].push_back( cgpt_reduction(kind, dim, ref) );
+	cgpt_reduction& ri = r[iplan].back();
+
+	if (_phases != Py_None) {
+	  // phases[mom][offset_mu + x_mu] with the fdimensions of the expression's grid
+	  ASSERT(ri.kind == cgpt_reduction::SLICE);
+	  ComplexD* data;
+	  int nmom, nx;
+	  cgpt_numpy_import_matrix(_phases,data,nmom,nx);
+	  ri.phases.resize(nmom);
+	  for (int m=0;m<nmom;m++)
+	    ri.phases[m].push_back( std::vector<ComplexD>(data + m*nx, data + (m+1)*nx) );
+	}
+
+	std::vector<_eval_term_> terms;
+	eval_plan_bind(*plan,terms,_operands,_coefficients,idx);
+
+	if (ri.phases.size() > 0) {
+	  // split the flat phase table per dimension
+	  GridBase* grid = 0;
+	  for (auto& t : terms)
+	    for (auto& f : t.factors)
+	      if (f.type == _eval_factor_::LATTICE)
+		grid = f.lattice->get_grid();
+	  ASSERT(grid);
+	  for (auto& p : ri.phases) {
+	    std::vector<ComplexD> flat = p[0];
+	    p.clear();
+	    size_t offset = 0;
+	    for (int mu=0;mu<grid->_ndimension;mu++) {
+	      size_t fd = grid->_fdimensions[mu];
+	      ASSERT(offset + fd <= flat.size());
+	      p.push_back( std::vector<ComplexD>(flat.begin() + offset, flat.begin() + offset + fd) );
+	      offset += fd;
+	    }
+	    ASSERT(offset == flat.size());
+	  }
+	}
+
+	eval_reduce(ri,terms,plan->unary);
+	ASSERT(ri.grid);
+      }
+    }
+
+    std::vector<ComplexD> buffer;
+    GridBase* grid = 0;
+    for (auto& rp : r)
+      for (auto& x : rp) {
+	buffer.insert(buffer.end(), x.result.begin(), x.result.end());
+	grid = x.grid;
+      }
+    if (grid)
+      grid->GlobalSumVector((RealD*)&buffer[0], 2*buffer.size());
+
+    PyObject* ret = PyList_New(nplans);
+    size_t offset = 0;
+    for (int iplan=0;iplan<nplans;iplan++) {
+      int n = (int)r[iplan].size();
+      PyObject* ret_plan = PyList_New(n);
+      for (int idx=0;idx<n;idx++) {
+	long size = (long)r[iplan][idx].result.size();
+	PyArrayObject* arr = (PyArrayObject*)PyArray_SimpleNew(1, &size, NPY_COMPLEX128);
+	memcpy(PyArray_DATA(arr),&buffer[offset],sizeof(ComplexD)*size);
+	offset += size;
+	PyList_SET_ITEM(ret_plan,idx,Py_BuildValue("(Ns)",arr,r[iplan][idx].otype.c_str()));
+      }
+      PyList_SET_ITEM(ret,iplan,ret_plan);
+    }
+    return ret;
+  });
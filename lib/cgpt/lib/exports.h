@@ -2,17 +2,35 @@
 EXPORT_FUNCTION(qr_decomp)
 EXPORT_FUNCTION(rotate)
 EXPORT_FUNCTION(linear_combination)
+EXPORT_FUNCTION(multi_linear_combination)
+EXPORT_FUNCTION(lattice_rank_inner_product)
 EXPORT_FUNCTION(block_project)
 EXPORT_FUNCTION(block_promote)
+EXPORT_FUNCTION(block_project_compressed)
+EXPORT_FUNCTION(block_promote_compressed)
 EXPORT_FUNCTION(block_orthonormalize)
+EXPORT_FUNCTION(create_compressed)
+EXPORT_FUNCTION(delete_compressed)
+EXPORT_FUNCTION(decompress)
+EXPORT_FUNCTION(compressed_nbytes)
+EXPORT_FUNCTION(compressed_linear_combination)
+EXPORT_FUNCTION(compressed_rotate)
 EXPORT_FUNCTION(coordinates_form_cartesian_view)
 EXPORT_FUNCTION(mview)
+EXPORT_FUNCTION(grid_cached_stats)
 EXPORT_FUNCTION(eval)
+EXPORT_FUNCTION(create_eval_plan)
+EXPORT_FUNCTION(delete_eval_plan)
+EXPORT_FUNCTION(execute_eval_plan)
+EXPORT_FUNCTION(eval_reduce)
 EXPORT_FUNCTION(create_grid)
 EXPORT_FUNCTION(delete_grid)
 EXPORT_FUNCTION(grid_barrier)
 EXPORT_FUNCTION(grid_globalsum)
+EXPORT_FUNCTION(grid_globalsum_start)
+EXPORT_FUNCTION(grid_globalsum_wait)
 EXPORT_FUNCTION(grid_get_processor)
+EXPORT_FUNCTION(grid_get_layout)
 EXPORT_FUNCTION(init)
 EXPORT_FUNCTION(exit)
 EXPORT_FUNCTION(load)
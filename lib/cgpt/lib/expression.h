@@ -42,5 +42,8 @@ template<typename T> cgpt_Lattice_base* cgpt_compatible_linear_combination(Latti
 
 #undef PER_TENSOR_TYPE
 
+// reductions
+#include "expression/reduce.h"
+
 // unary
 #include "expression/unary.h"
@@ -124,6 +124,16 @@ cgpt_Lattice_base* cgpt_lattice_mul(cgpt_Lattice_base* dst, bool ac, int unary_a
 #include "../basis_size.h"
 #undef BASIS_SIZE
 
+#define BASIS_SIZE(n)							\
+  template<typename vtype>						\
+  cgpt_Lattice_base* cgpt_lattice_mul(cgpt_Lattice_base* dst, bool ac, int unary_a, Lattice< iComplexM ## n<vtype> >& la,int unary_b, cgpt_Lattice_base* b, int unary_expr) { \
+    _COMPATIBLE_(iComplexV ## n);					\
+    _COMPATIBLE_(iComplexM ## n);					\
+    ERR("Not implemented");						\
+  }
+#include "../basis_size.h"
+#undef BASIS_SIZE
+
 #undef typeClose
 #undef typeOpen
 #undef castas
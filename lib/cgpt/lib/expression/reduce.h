@@ -0,0 +1,228 @@
+/*
+    GPT - Grid Python Toolkit
+    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+*/
+
+// Reductions fused with the evaluation of an expression
+//
+//  While a reduction is active, the final assignments of an expression
+//  evaluation (lattice_expr / lattice_lat) do not write to a lattice but
+//  instead accumulate the site-local values of the expression into the
+//  local result of the reduction.  The global sum is taken by the caller.
+class cgpt_reduction {
+public:
+  enum { SUM, SLICE, NORM2, INNER } kind;
+  int dim;                      // dimension for SLICE
+  std::vector< std::vector< std::vector<ComplexD> > > phases; // SLICE momentum phases [mom][mu][global coordinate]
+  cgpt_Lattice_base* ref;       // left factor for INNER
+  ComplexD coef;                // coefficient of current contribution
+  GridBase* grid;
+  std::string otype;
+  std::vector<ComplexD> result; // local result, flattened
+
+  cgpt_reduction(const std::string& _kind, int _dim, cgpt_Lattice_base* _ref) : dim(_dim), ref(_ref), coef(1.0), grid(0) {
+    if (_kind == "sum") {
+      kind = SUM;
+    } else if (_kind == "slice") {
+      kind = SLICE;
+    } else if (_kind == "norm2") {
+      kind = NORM2;
+    } else if (_kind == "inner") {
+      kind = INNER;
+      ASSERT(ref);
+    } else {
+      ERR("Unknown reduction %s", _kind.c_str());
+    }
+  }
+
+  // does the reduction distribute over the terms of an expression?
+  bool linear() {
+    return kind != NORM2;
+  }
+
+  void prepare(GridBase* _grid, const std::string& _otype, size_t n) {
+    if (result.size() == 0) {
+      result.resize(n, 0.0);
+      otype = _otype;
+      grid = _grid;
+    } else {
+      ASSERT(result.size() == n && otype == _otype);
+    }
+  }
+
+  template<typename Coeff_t>
+  void accumulate(size_t offset, const Coeff_t* v, size_t n) {
+    ComplexD scale = (kind == NORM2) ? ComplexD(std::norm(coef)) : coef;
+    for (size_t i=0;i<n;i++)
+      result[offset + i] += scale * (ComplexD)v[i];
+  }
+};
+
+extern cgpt_reduction* cgpt_active_reduction;
+
+struct cgpt_reduction_scope {
+  cgpt_reduction_scope(cgpt_reduction& r) { cgpt_active_reduction = &r; }
+  ~cgpt_reduction_scope() { cgpt_active_reduction = 0; }
+};
+
+template<typename vobj, typename F>
+void cgpt_reduce_sites(cgpt_reduction& r, GridBase* grid, F site) {
+  typedef typename vobj::scalar_object sobj;
+  typedef typename vobj::scalar_type Coeff_t;
+  const size_t words = sizeof(sobj) / sizeof(Coeff_t);
+  int64_t osites = grid->oSites();
+  int nthread = GridThread::GetThreads();
+
+  if (r.kind == cgpt_reduction::SUM) {
+
+    r.prepare(grid, get_otype(vobj()), words);
+    std::vector<vobj,alignedAllocator<vobj> > partial(nthread);
+    thread_for(t, nthread, {
+	vobj s = Zero();
+	for (int64_t ss = osites * t / nthread; ss < osites * (t + 1) / nthread; ss++)
+	  s += site(ss);
+	partial[t] = s;
+      });
+    vobj s = Zero();
+    for (auto& p : partial)
+      s += p;
+    sobj c = Reduce(s);
+    r.accumulate(0, (Coeff_t*)&c, words);
+
+  } else if (r.kind == cgpt_reduction::SLICE) {
+
+    // same site ordering as Grid's sliceSum
+    int orthogdim = r.dim;
+    ASSERT(orthogdim >= 0 && orthogdim < grid->_ndimension);
+    int Nsimd = grid->Nsimd();
+    int ld = grid->_ldimensions[orthogdim];
+    int rd = grid->_rdimensions[orthogdim];
+    int fd = grid->_fdimensions[orthogdim];
+    int e1 = grid->_slice_nblock[orthogdim];
+    int e2 = grid->_slice_block[orthogdim];
+    int stride = grid->_slice_stride[orthogdim];
+    int ostride = grid->_ostride[orthogdim];
+
+    // without momenta, a single unit phase
+    int nmom = r.phases.size();
+    int nd = grid->_ndimension;
+    r.prepare(grid, get_otype(vobj()), std::max(nmom,1) * fd * words);
+    std::vector<vobj,alignedAllocator<vobj> > lvSum(rd * std::max(nmom,1));
+    Coordinate icoor(nd);
+
+    if (nmom == 0) {
+      thread_for(rt, rd, {
+	  vobj s = Zero();
+	  int so = rt * ostride;
+	  for (int n=0;n<e1;n++)
+	    for (int b=0;b<e2;b++)
+	      s += site(so + n*stride + b);
+	  lvSum[rt] = s;
+	});
+    } else {
+      // phases factorize, tabulate them per dimension in SIMD layout;
+      // coordinates are only those of the full grid without checkerboarding
+      for (int mu=0;mu<nd;mu++)
+	ASSERT(grid->_gdimensions[mu] == grid->_fdimensions[mu]);
+      typedef typename vobj::vector_type vector_type;
+      std::vector< std::vector< std::vector<vector_type,alignedAllocator<vector_type> > > > vphase(nmom);
+      for (int m=0;m<nmom;m++) {
+	ASSERT(r.phases[m].size() == nd);
+	vphase[m].resize(nd);
+	for (int mu=0;mu<nd;mu++) {
+	  ASSERT(r.phases[m][mu].size() == grid->_fdimensions[mu]);
+	  int rdm = grid->_rdimensions[mu];
+	  vphase[m][mu].resize(rdm);
+	  for (int o=0;o<rdm;o++) {
+	    Coeff_t* p = (Coeff_t*)&vphase[m][mu][o];
+	    for (int idx=0;idx<Nsimd;idx++) {
+	      grid->iCoorFromIindex(icoor,idx);
+	      int x = o + icoor[mu]*rdm + grid->_ldimensions[mu]*grid->_processor_coor[mu];
+	      p[idx] = (Coeff_t)r.phases[m][mu][x];
+	    }
+	  }
+	}
+      }
+
+      thread_for(rt, rd, {
+	  std::vector<vobj,alignedAllocator<vobj> > s(nmom);
+	  for (int m=0;m<nmom;m++)
+	    s[m] = Zero();
+	  Coordinate ocoor(nd);
+	  int so = rt * ostride;
+	  for (int n=0;n<e1;n++) {
+	    for (int b=0;b<e2;b++) {
+	      int64_t ss = so + n*stride + b;
+	      vobj x = site(ss);
+	      grid->oCoorFromOindex(ocoor,ss);
+	      for (int m=0;m<nmom;m++) {
+		vector_type ph = vphase[m][0][ocoor[0]];
+		for (int mu=1;mu<nd;mu++)
+		  ph = ph * vphase[m][mu][ocoor[mu]];
+		s[m] += x * ph;
+	      }
+	    }
+	  }
+	  for (int m=0;m<nmom;m++)
+	    lvSum[m*rd + rt] = s[m];
+	});
+    }
+
+    for (int m=0;m<std::max(nmom,1);m++) {
+      for (int rt=0;rt<rd;rt++) {
+	for (int idx=0;idx<Nsimd;idx++) {
+	  grid->iCoorFromIindex(icoor,idx);
+	  int ldx = rt + icoor[orthogdim]*rd;
+	  int pt = ldx + ld*grid->_processor_coor[orthogdim];
+	  sobj c = extractLane(idx,lvSum[m*rd + rt]);
+	  r.accumulate((m*fd + pt) * words, (Coeff_t*)&c, words);
+	}
+      }
+    }
+
+  } else {
+
+    // NORM2 and INNER, accumulate in double precision
+    r.prepare(grid, get_otype(vobj()), 1);
+    typedef decltype(TensorRemove(innerProductD2(vobj(),vobj()))) ip_t;
+    std::vector<ip_t,alignedAllocator<ip_t> > partial(nthread);
+    if (r.kind == cgpt_reduction::NORM2) {
+      thread_for(t, nthread, {
+	  ip_t s = Zero();
+	  for (int64_t ss = osites * t / nthread; ss < osites * (t + 1) / nthread; ss++) {
+	    vobj x = site(ss);
+	    s += TensorRemove(innerProductD2(x,x));
+	  }
+	  partial[t] = s;
+	});
+    } else {
+      auto ref_v = compatible<vobj>(r.ref)->l.View();
+      thread_for(t, nthread, {
+	  ip_t s = Zero();
+	  for (int64_t ss = osites * t / nthread; ss < osites * (t + 1) / nthread; ss++)
+	    s += TensorRemove(innerProductD2(ref_v[ss],site(ss)));
+	  partial[t] = s;
+	});
+    }
+    ip_t s = Zero();
+    for (auto& p : partial)
+      s += p;
+    ComplexD c = Reduce(s);
+    r.accumulate(0, &c, 1);
+
+  }
+}
@@ -24,6 +24,11 @@ cgpt_Lattice_base* lattice_expr(cgpt_Lattice_base* dst, bool ac, const A& expr)
   typedef decltype(eval(0,expr)) const_vobj;
   typedef typename std::remove_const<const_vobj>::type vobj;
 
+  if (cgpt_active_reduction) {
+    cgpt_reduce_sites<vobj>(*cgpt_active_reduction, grid, [&](int64_t ss) { return eval(ss,expr); });
+    return dst;
+  }
+
   if (dst) {
     auto& l = compatible<vobj>(dst)->l;
     if (ac) {
@@ -41,12 +46,27 @@ cgpt_Lattice_base* lattice_expr(cgpt_Lattice_base* dst, bool ac, const A& expr)
 
 }
 
+// coarse matrices have no spin/color indices, their trace is not a lattice type
+template<typename vobj> struct cgpt_has_trace : std::true_type {};
+template<typename vtype,int N> struct cgpt_has_trace<iMatrix<vtype,N>> : std::false_type {};
+
+template<typename A>
+cgpt_Lattice_base* lattice_trace(cgpt_Lattice_base* dst, bool ac, const A& la, std::true_type) {
+  return lattice_expr(dst, ac, trace(la));
+}
+
+template<typename A>
+cgpt_Lattice_base* lattice_trace(cgpt_Lattice_base* dst, bool ac, const A& la, std::false_type) {
+  ERR("Not implemented");
+}
+
 template<typename A>
 cgpt_Lattice_base* lattice_unary(cgpt_Lattice_base* dst, bool ac, const A& la,int unary_expr) {
+  typedef typename std::remove_const<decltype(eval(0,la))>::type vobj;
   if (unary_expr == 0) {
     return lattice_expr(dst, ac, la);
   } else if (unary_expr == (BIT_SPINTRACE|BIT_COLORTRACE)) {
-    return lattice_expr(dst, ac, trace(la));
+    return lattice_trace(dst, ac, la, cgpt_has_trace<vobj>());
   }
   ERR("Not implemented");
 }
@@ -55,6 +75,13 @@ template<typename A>
 cgpt_Lattice_base* lattice_lat(cgpt_Lattice_base* dst, bool ac, const A& lat) {
   typedef typename A::vector_object const_vobj;
   typedef typename std::remove_const<const_vobj>::type vobj;
+
+  if (cgpt_active_reduction) {
+    auto lat_v = lat.View();
+    cgpt_reduce_sites<vobj>(*cgpt_active_reduction, lat.Grid(), [&](int64_t ss) { return lat_v[ss]; });
+    return dst;
+  }
+
   if (dst) {
     auto& l = compatible<vobj>(dst)->l;
     if (ac) {
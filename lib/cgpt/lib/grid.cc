@@ -18,6 +18,18 @@
 */
 #include "lib.h"
 
+#if defined (GRID_COMMS_MPI3)
+#define USE_MPI 1
+#endif
+
+// pending non-blocking global sum of a numpy array, keeps the array alive
+struct cgpt_globalsum_request {
+  PyObject* array;
+#ifdef USE_MPI
+  MPI_Request request;
+#endif
+};
+
 EXPORT(create_grid,{
     
     PyObject* _gdimension, * _precision, * _type;
@@ -160,6 +172,65 @@ EXPORT(grid_globalsum,{
     return PyLong_FromLong(0);
   });
 
+EXPORT(grid_globalsum_start,{
+
+    void* p;
+    PyObject* o;
+    if (!PyArg_ParseTuple(args, "lO", &p,&o)) {
+      return NULL;
+    }
+
+    GridBase* grid = (GridBase*)p;
+    ASSERT(PyArray_Check(o));
+    PyArrayObject* ao = (PyArrayObject*)o;
+    int dt = PyArray_TYPE(ao);
+    void* data = PyArray_DATA(ao);
+    size_t nbytes = PyArray_NBYTES(ao);
+
+    cgpt_globalsum_request* r = new cgpt_globalsum_request();
+    r->array = o;
+    Py_XINCREF(o);
+
+#ifdef USE_MPI
+    if (dt == NPY_FLOAT32 || dt == NPY_COMPLEX64) {
+      ASSERT(MPI_SUCCESS == MPI_Iallreduce(MPI_IN_PLACE,data,(int)(nbytes / 4),MPI_FLOAT,MPI_SUM,grid->communicator,&r->request));
+    } else if (dt == NPY_FLOAT64 || dt == NPY_COMPLEX128) {
+      ASSERT(MPI_SUCCESS == MPI_Iallreduce(MPI_IN_PLACE,data,(int)(nbytes / 8),MPI_DOUBLE,MPI_SUM,grid->communicator,&r->request));
+    } else {
+      ERR("Unsupported numy data type (single, double, csingle, cdouble currently allowed)");
+    }
+#else
+    // no non-blocking reduction available, sum right away
+    if (dt == NPY_FLOAT32 || dt == NPY_COMPLEX64) {
+      grid->GlobalSumVector((RealF*)data, nbytes / 4);
+    } else if (dt == NPY_FLOAT64 || dt == NPY_COMPLEX128) {
+      grid->GlobalSumVector((RealD*)data, nbytes / 8);
+    } else {
+      ERR("Unsupported numy data type (single, double, csingle, cdouble currently allowed)");
+    }
+#endif
+
+    return PyLong_FromVoidPtr(r);
+  });
+
+EXPORT(grid_globalsum_wait,{
+
+    void* p;
+    if (!PyArg_ParseTuple(args, "l", &p)) {
+      return NULL;
+    }
+
+    cgpt_globalsum_request* r = (cgpt_globalsum_request*)p;
+#ifdef USE_MPI
+    MPI_Status status;
+    ASSERT(MPI_SUCCESS == MPI_Wait(&r->request,&status));
+#endif
+    Py_XDECREF(r->array);
+    delete r;
+
+    return PyLong_FromLong(0);
+  });
+
 EXPORT(grid_get_processor,{
     
     void* p;
@@ -176,4 +247,19 @@ EXPORT(grid_get_processor,{
     return Py_BuildValue("(l,l,N,N,N)",rank,ranks,coor,gdims,ldims);
     
   });
+
+EXPORT(grid_get_layout,{
+    
+    void* p;
+    if (!PyArg_ParseTuple(args, "l", &p)) {
+      return NULL;
+    }
+    
+    GridBase* grid = (GridBase*)p;
+    long Nsimd = grid->Nsimd();
+    PyObject* simd = cgpt_convert(grid->_simd_layout);
+    PyObject* rdims = cgpt_convert(grid->_rdimensions);
+    return Py_BuildValue("(l,N,N)",Nsimd,simd,rdims);
+    
+  });
   
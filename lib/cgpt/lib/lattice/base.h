@@ -17,6 +17,7 @@
     51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 */
 class cgpt_lattice_term;
+struct cgpt_compressed;
 class cgpt_Lattice_base {
 public:
   virtual ~cgpt_Lattice_base() { };
@@ -46,11 +47,15 @@ public:
   virtual int get_checkerboard() = 0;
   virtual void basis_rotate(std::vector<cgpt_Lattice_base*> &basis,RealD* Qt,int j0, int j1, int k0,int k1,int Nm) = 0;
   virtual void linear_combination(std::vector<cgpt_Lattice_base*> &basis,RealD* Qt) = 0;
+  virtual void multi_linear_combination(std::vector<cgpt_Lattice_base*> &dst,std::vector<cgpt_Lattice_base*> &src,ComplexD* coef,std::vector<int> &ac) = 0;
+  virtual void rank_inner_product(ComplexD* res,std::vector<cgpt_Lattice_base*> &left,std::vector<cgpt_Lattice_base*> &right,bool diagonal) = 0;
   virtual PyObject* memory_view() = 0; // access to internal memory storage, can be simd format
   virtual void describe_data_layout(long & Nsimd, long & word, long & simd_word, std::vector<long> & ishape) = 0;
   virtual int get_numpy_dtype() = 0;
-  virtual void block_project(cgpt_Lattice_base* coarse, std::vector<cgpt_Lattice_base*>& basis) = 0;
-  virtual void block_promote(cgpt_Lattice_base* coarse, std::vector<cgpt_Lattice_base*>& basis) = 0;
+  virtual void block_project(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_Lattice_base*>& basis, bool ac) = 0;
+  virtual void block_promote(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_Lattice_base*>& basis) = 0;
+  virtual void block_project_compressed(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_compressed*>& basis, bool ac) = 0;
+  virtual void block_promote_compressed(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_compressed*>& basis) = 0;
   virtual void block_orthonormalize(cgpt_Lattice_base* coarse, std::vector<cgpt_Lattice_base*>& basis) = 0;
   virtual GridBase* get_grid() = 0;
 };
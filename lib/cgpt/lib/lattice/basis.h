@@ -19,3 +19,4 @@
 
 #include "basis/convert.h"
 #include "basis/rotate.h"
+#include "basis/inner.h"
@@ -0,0 +1,69 @@
+/*
+    GPT - Grid Python Toolkit
+    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+*/
+
+// res[i*nright + j] = <left[i],right[j]> summed over the local sites only, or
+// res[i] = <left[i],right[i]> if diagonal; the caller takes the global sum
+template<class Field>
+void cgpt_rank_inner_product(ComplexD* res,std::vector<Field*> &left,std::vector<Field*> &right,bool diagonal) {
+  typedef typename Field::vector_object vobj;
+  typedef decltype(left[0]->View()) View;
+  typedef decltype(TensorRemove(innerProductD2(vobj(),vobj()))) ip_t;
+  GridBase* grid = left[0]->Grid();
+  int nleft = (int)left.size();
+  int nright = (int)right.size();
+  if (diagonal)
+    ASSERT(nleft == nright);
+  int n = diagonal ? nleft : nleft * nright;
+  int64_t osites = grid->oSites();
+  int nthread = GridThread::GetThreads();
+
+  auto tmp_v = left[0]->View();
+  std::vector<View> left_v(nleft,tmp_v), right_v(nright,tmp_v);
+  for (int i=0;i<nleft;i++)
+    left_v[i] = left[i]->View();
+  for (int j=0;j<nright;j++)
+    right_v[j] = right[j]->View();
+
+  std::vector<ip_t,alignedAllocator<ip_t> > partial(nthread * n);
+  thread_for(t, nthread, {
+      ip_t* p = &partial[t * n];
+      for (int i=0;i<n;i++)
+	p[i] = Zero();
+      for (int64_t ss = osites * t / nthread; ss < osites * (t + 1) / nthread; ss++) {
+	if (diagonal) {
+	  for (int i=0;i<nleft;i++)
+	    p[i] += TensorRemove(innerProductD2(left_v[i][ss],right_v[i][ss]));
+	} else {
+	  // each right vector is loaded once per site
+	  for (int j=0;j<nright;j++) {
+	    vobj r = right_v[j][ss];
+	    for (int i=0;i<nleft;i++)
+	      p[i*nright + j] += TensorRemove(innerProductD2(left_v[i][ss],r));
+	  }
+	}
+      }
+    });
+
+  for (int i=0;i<n;i++) {
+    ip_t s = Zero();
+    for (int t=0;t<nthread;t++)
+      s += partial[t * n + i];
+    res[i] = Reduce(s);
+  }
+}
@@ -64,3 +64,55 @@ void cgpt_linear_combination(Field &result,std::vector<Field*> &basis,RealD* Qt)
       result_v[ss] = B;
     });
 }
+
+// dst[d] = (ac[d] ? dst[d] : 0) + sum_s coef[d*nsrc + s] * src[s], each source is loaded once per site;
+// all sources are read before the destinations of a site are written
+template<class Field>
+void cgpt_multi_linear_combination(std::vector<Field*> &dst,std::vector<Field*> &src,ComplexD* coef,std::vector<int> &ac) {
+  typedef typename Field::vector_object vobj;
+  typedef typename Field::scalar_type Coeff_t;
+  typedef decltype(dst[0]->View()) View;
+  GridBase* grid = dst[0]->Grid();
+  int ndst = (int)dst.size();
+  int nsrc = (int)src.size();
+
+  // only keep non-zero coefficients
+  std::vector< std::vector< std::pair<int,Coeff_t> > > terms(ndst);
+  for (int d=0;d<ndst;d++) {
+    for (int s=0;s<nsrc;s++) {
+      ComplexD c = coef[d*nsrc + s];
+      if (c != 0.0)
+	terms[d].push_back(std::make_pair(s,(Coeff_t)c));
+    }
+  }
+
+  auto tmp_v = dst[0]->View();
+  std::vector<View> dst_v(ndst,tmp_v), src_v(nsrc,tmp_v);
+  for (int d=0;d<ndst;d++) {
+    dst_v[d] = dst[d]->View();
+    if (nsrc)
+      dst[d]->Checkerboard() = src[0]->Checkerboard();
+  }
+  for (int s=0;s<nsrc;s++)
+    src_v[s] = src[s]->View();
+
+  thread_region
+  {
+    std::vector < vobj > x(nsrc); // Thread private
+    thread_for_in_region(ss, grid->oSites(),{
+	for (int s=0;s<nsrc;s++)
+	  x[s] = src_v[s][ss];
+
+	for (int d=0;d<ndst;d++) {
+	  vobj r;
+	  if (ac[d])
+	    r = dst_v[d][ss];
+	  else
+	    r = Zero();
+	  for (auto& t : terms[d])
+	    r += t.second * x[t.first];
+	  dst_v[d][ss] = r;
+	}
+      });
+  }
+}
@@ -158,6 +158,20 @@ public:
     cgpt_linear_combination(l,basis,Qt);
   }
 
+  virtual void multi_linear_combination(std::vector<cgpt_Lattice_base*> &_dst,std::vector<cgpt_Lattice_base*> &_src,ComplexD* coef,std::vector<int> &ac) {
+    std::vector<Lattice<T>*> dst(_dst.size()), src(_src.size());
+    cgpt_basis_fill(dst,_dst);
+    cgpt_basis_fill(src,_src);
+    cgpt_multi_linear_combination(dst,src,coef,ac);
+  }
+
+  virtual void rank_inner_product(ComplexD* res,std::vector<cgpt_Lattice_base*> &_left,std::vector<cgpt_Lattice_base*> &_right,bool diagonal) {
+    std::vector<Lattice<T>*> left(_left.size()), right(_right.size());
+    cgpt_basis_fill(left,_left);
+    cgpt_basis_fill(right,_right);
+    cgpt_rank_inner_product(res,left,right,diagonal);
+  }
+
   virtual PyObject* memory_view() {
     auto v = l.View();
     return PyMemoryView_FromMemory((char*)&v[0],v.size()*sizeof(v[0]),PyBUF_WRITE);
@@ -176,11 +190,19 @@ public:
     return infer_numpy_type(Coeff_t());
   }
 
-  virtual void block_project(cgpt_Lattice_base* coarse, std::vector<cgpt_Lattice_base*>& basis) {
-    cgpt_block_project(coarse,l,basis);
+  virtual void block_project(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_Lattice_base*>& basis, bool ac) {
+    cgpt_block_project(coarse,l,basis,ac);
+  }
+
+  virtual void block_promote(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_Lattice_base*>& basis) {
+    cgpt_block_promote(coarse,l,basis);
+  }
+
+  virtual void block_project_compressed(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_compressed*>& basis, bool ac) {
+    cgpt_block_project(coarse,l,basis,ac);
   }
 
-  virtual void block_promote(cgpt_Lattice_base* coarse, std::vector<cgpt_Lattice_base*>& basis) {
+  virtual void block_promote_compressed(std::vector<cgpt_Lattice_base*>& coarse, std::vector<cgpt_compressed*>& basis) {
     cgpt_block_promote(coarse,l,basis);
   }
 
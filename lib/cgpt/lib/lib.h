@@ -45,4 +45,5 @@ using namespace Grid;
 #include "precision.h"
 #include "util.h"
 #include "expression.h"
+#include "compressed.h"
 #include "block.h"
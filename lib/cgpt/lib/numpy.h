@@ -148,3 +148,14 @@ static void cgpt_numpy_import_vector(PyObject* _Qt, RealD* & data, int & Nm) {
   ASSERT(PyArray_TYPE(Qt) == NPY_FLOAT64);
   data = (RealD*)PyArray_DATA(Qt);
 }
+
+static void cgpt_numpy_import_matrix(PyObject* _Qt, ComplexD* & data, int & n0, int & n1) {
+  ASSERT(PyArray_Check(_Qt));
+  PyArrayObject* Qt = (PyArrayObject*)_Qt;
+  ASSERT(PyArray_NDIM(Qt)==2);
+  n0 = PyArray_DIM(Qt,0);
+  n1 = PyArray_DIM(Qt,1);
+  // TODO: check and at least forbid strides
+  ASSERT(PyArray_TYPE(Qt) == NPY_COMPLEX128);
+  data = (ComplexD*)PyArray_DATA(Qt);
+}
@@ -20,3 +20,4 @@ from gpt.algorithms.approx.chebyshev import chebyshev
 from gpt.algorithms.approx.deflate import deflate
 from gpt.algorithms.approx.coarse_deflate import coarse_deflate
 from gpt.algorithms.approx.evals import evals
+from gpt.algorithms.approx.chronological_guess import chronological_guess
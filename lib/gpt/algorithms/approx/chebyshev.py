@@ -132,15 +132,13 @@ class chebyshev:
         Tnm,Tn,Tnp=T0,T1,T2
         mat(T0,y)
         T1 @= y*xscale + src*mscale
-        for i in range(self.n):
-            dst[i] @= (0.5*self.coeffs[i][0])*T0 + self.coeffs[i][1]*T1
+        g.eval_many([ (dst[i], (0.5*self.coeffs[i][0])*T0 + self.coeffs[i][1]*T1, False) for i in range(self.n) ])
         for n in range(2,self.morder):
             mat(Tn,y)
-            y @= xscale*y + mscale*Tn
-            Tnp @= 2.0*y - Tnm
-            for i in range(self.n):
-                if len(self.coeffs[i]) > n:
-                    dst[i] += self.coeffs[i][n]*Tnp
+            # Tnp = 2*(xscale*y + mscale*Tn) - Tnm, update dst in the same sweep
+            Tnp_expr = (2.0*xscale)*y + (2.0*mscale)*Tn - Tnm
+            g.eval_many([ (Tnp, Tnp_expr, False) ] +
+                        [ (dst[i], self.coeffs[i][n]*Tnp_expr, True) for i in range(self.n) if len(self.coeffs[i]) > n ])
             Tnm,Tn,Tnp=Tn,Tnp,Tnm
 
     def __call__(self, mat, src = None, dst = None):
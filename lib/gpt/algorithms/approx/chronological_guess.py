@@ -0,0 +1,124 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt as g
+import numpy as np
+
+def combination(vectors, c, first = None):
+    # first + sum_i c[i] vectors[i] as linear combination for eval_many
+    val=[] if first is None else [ (1.0, [ (g.factor_unary.NONE,first) ]) ]
+    return g.expr(val + [ (complex(c[i]), [ (g.factor_unary.NONE,v) ]) for i,v in enumerate(vectors) ])
+
+class chronological_guess:
+
+    # minimal residual extrapolation: the initial guess for the next solve
+    # is dst = V (V^dag mat V)^-1 V^dag src, V an orthonormal basis of the
+    # last params["window"] solutions.  V, W = mat V and V^dag W are updated
+    # with each solution.  Since mat x = src for a solution x up to the
+    # solver tolerance, W follows from the sources and mat is never applied;
+    # if mat changes between solves, the guess remains valid but is less
+    # accurate.
+    def __init__(self, params):
+        self.params = params
+        self.window = params["window"]
+        self.basis = [] # V
+        self.images = [] # W
+        self.gram = np.zeros((0,0),dtype=np.complex128) # V^dag W
+        self.coef = np.zeros((0,0),dtype=np.complex128) # solutions are V coef
+        self.src = None
+        self.iterations = []
+
+    def __call__(self, mat, src, dst):
+        verbose=g.default.is_verbose("chronological_guess")
+        self.src=src
+        dst.checkerboard(src.checkerboard())
+        n=len(self.basis)
+        if n == 0:
+            dst[:]=0
+            return
+        t0=g.time()
+        y=np.linalg.solve(self.gram,g.inner_products(self.basis,src))
+        g.eval_many([ (dst, combination(self.basis,y), False) ])
+        t1=g.time()
+        if verbose:
+            g.message("Chronological guess from %d solutions in %g s" % (n,t1-t0))
+
+    def add(self, x, b):
+        # Gram-Schmidt with one reorthogonalization of x against V, its
+        # image b is transformed along
+        n=len(self.basis)
+        c=np.zeros((n,),dtype=np.complex128)
+        v=g.copy(x)
+        w=g.copy(b)
+        for i in range(2 if n > 0 else 0):
+            ip=g.inner_products(self.basis,v)
+            g.eval_many([ (v, combination(self.basis,-ip,v), False),
+                          (w, combination(self.images,-ip,w), False) ])
+            c+=ip
+        nrm=g.norm2(v)
+        if nrm <= 1e-14 * g.norm2(x): # linearly dependent solution
+            self.coef=np.concatenate([ self.coef, c.reshape(n,1) ],axis=1)
+            return
+        nrm=nrm**0.5
+        v @= (1.0 / nrm) * v
+        w @= (1.0 / nrm) * w
+        # new column and row of V^dag W in a single global sum
+        ip=g.rank_inner_product(self.basis + [ v ],[ w ])
+        if n > 0:
+            ip=np.concatenate([ ip, g.rank_inner_product([ v ],self.images) ])
+        v.grid.globalsum(ip)
+        gram=np.zeros((n+1,n+1),dtype=np.complex128)
+        gram[0:n,0:n]=self.gram
+        gram[:,n]=ip[0:n+1]
+        gram[n,0:n]=ip[n+1:]
+        coef=np.zeros((n+1,self.coef.shape[1]+1),dtype=np.complex128)
+        coef[0:n,0:-1]=self.coef
+        coef[0:n,-1]=c
+        coef[n,-1]=nrm
+        self.gram=gram
+        self.coef=coef
+        self.basis.append(v)
+        self.images.append(w)
+
+    def drop_oldest(self):
+        # orthonormal basis V' = V q of the remaining solutions from
+        # coef[:,1:] = q r, this needs no inner products of lattices
+        coef=self.coef[:,1:]
+        if len(self.basis) == 0:
+            self.coef=coef
+            return
+        q,r=np.linalg.qr(coef)
+        k=q.shape[1]
+        g.eval_many([ (self.basis[j], combination(self.basis,q[:,j]), False) for j in range(k) ] +
+                    [ (self.images[j], combination(self.images,q[:,j]), False) for j in range(k) ])
+        del self.basis[k:]
+        del self.images[k:]
+        self.gram=q.conj().T @ self.gram @ q
+        self.coef=r
+
+    def update(self, x, iterations = None):
+        # add solution x for the source of the last call
+        assert(not self.src is None)
+        if self.coef.shape[1] == self.window:
+            self.drop_oldest()
+        self.add(x, self.src)
+        self.src=None
+        if not iterations is None:
+            self.iterations.append(iterations)
+            if g.default.is_verbose("chronological_guess"):
+                g.message("Chronological guess: %d iterations, %d saved compared to the first solve" % (iterations,self.iterations[0] - iterations))
@@ -31,9 +31,21 @@ class deflate:
         verbose=g.default.is_verbose("deflate")
         # |dst> = sum_n 1/ev[n] |n><n|src>
         t0=g.time()
-        dst[:]=0
-        for i,n in enumerate(self.evec):
-            dst += n*g.innerProduct(n,src)/self.ev[i]
+        if type(self.evec) == g.block.compressed_evec:
+            # deflate on the coarse grid, only a single projection and promotion on the fine grid
+            csrc=self.evec.project(src)
+            cdst=g.lattice(csrc)
+            cdst[:]=0
+            ip=self.evec.coarse_inner_products(csrc)
+            g.eval_many([ (cdst, n*complex(ip[i])/self.ev[i], True) for i,n in enumerate(self.evec.coarse) ])
+            self.evec.promote(cdst,dst)
+        else:
+            dst[:]=0
+            if all([ type(n) == g.lattice for n in self.evec ]):
+                ip=g.inner_products(self.evec,src) # single global sum
+            else:
+                ip=[ g.innerProduct(n,src) for n in self.evec ]
+            g.eval_many([ (dst, n*complex(ip[i])/self.ev[i], True) for i,n in enumerate(self.evec) ])
         t1=g.time()
         if verbose:
             g.message("Deflated in %g s" % (t1-t0))
@@ -0,0 +1,88 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt as g
+import numpy as np
+
+def gram(a, b):
+    # matrix of <a[i],b[j]> with a single global sum
+    ip=g.rank_inner_product(a,b)
+    a[0].grid.globalsum(ip)
+    return ip.reshape(len(a),len(b))
+
+def combination(basis, coef, j, first = None):
+    # first + sum_i basis[i]*coef[i,j] as linear combination for eval_many
+    val=[ (complex(coef[i,j]), [ (g.factor_unary.NONE,b) ]) for i,b in enumerate(basis) ]
+    if not first is None:
+        val=[ (1.0, [ (g.factor_unary.NONE,first) ]) ] + val
+    return g.expr(val)
+
+class block_cg:
+
+    # O'Leary's block conjugate gradient for all right-hand sides of a
+    # hermitian positive definite mat in a shared search space; the scalar
+    # alpha and beta of cg become small dense matrices and converged columns
+    # are removed from the block
+    def __init__(self, params):
+        self.params = params
+        self.eps = params["eps"]
+        self.maxiter = params["maxiter"]
+        self.history = None
+
+    def __call__(self, mat, src, psi):
+        src,psi=list(src),list(psi)
+        n=len(src)
+        assert(n == len(psi) and all([ s != x for s,x in zip(src,psi) ]))
+        self.history = []
+        verbose=g.default.is_verbose("block_cg")
+        t0=g.time()
+        p,mmp,r=[ g.copy(s) for s in src ],[ g.copy(s) for s in src ],[ g.copy(s) for s in src ]
+        for j in range(n):
+            mat(psi[j],mmp[j]) # in, out
+        g.eval_many([ (r[j], src[j] - mmp[j], False) for j in range(n) ] +
+                    [ (p[j], src[j] - mmp[j], False) for j in range(n) ])
+        ssq = g.norm2(g.batch(src))
+        rsq = self.eps**2. * ssq
+        rr = gram(r,r)
+        res = rr.diagonal().real.copy()
+        active = [ j for j in range(n) if res[j] > rsq[j] ]
+        rr = rr[np.ix_(active,active)]
+        for k in range(1,self.maxiter+1):
+            if len(active) == 0:
+                break
+            pa,ra,mmpa=[ p[j] for j in active ],[ r[j] for j in active ],[ mmp[j] for j in active ]
+            for j in active:
+                mat(p[j], mmp[j])
+            alpha=np.linalg.solve(gram(pa,mmpa),rr)
+            g.eval_many([ (psi[j], combination(pa,alpha,i), True) for i,j in enumerate(active) ] +
+                        [ (r[j], combination(mmpa,-alpha,i,r[j]), False) for i,j in enumerate(active) ])
+            rrp=gram(ra,ra)
+            beta=np.linalg.solve(rr,rrp)
+            g.eval_many([ (p[j], combination(pa,beta,i,r[j]), False) for i,j in enumerate(active) ])
+            rr=rrp
+            res[active]=rr.diagonal().real
+            self.history.append(res.copy())
+            if verbose:
+                g.message("res^2[ %d ] = %g (max), %d of %d right-hand sides active" % (k,max(res[active]),len(active),n))
+            keep=[ i for i,j in enumerate(active) if res[j] > rsq[j] ]
+            if len(keep) != len(active):
+                active=[ active[i] for i in keep ]
+                rr=rr[np.ix_(keep,keep)]
+        if verbose and len(active) == 0:
+            t1=g.time()
+            g.message("Converged in %g s" % (t1-t0))
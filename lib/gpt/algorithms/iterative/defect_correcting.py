@@ -0,0 +1,67 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt as g
+
+class defect_correcting:
+
+    # the residual is computed and the solution accumulated in the precision
+    # of src, the correction is solved for by the inner solver in
+    # params["precision"] (default single)
+    def __init__(self, inner, params):
+        self.inner = inner
+        self.params = params
+        self.eps = params["eps"]
+        self.maxiter = params["maxiter"]
+        self.inner_precision = params["precision"] if "precision" in params else g.single
+        self.history = None
+        self.fields = {}
+
+    def __call__(self, mat, src, psi):
+        # mat = (mat, inner_mat, inner_grid), the operator in the precision of
+        # src and in the inner precision acting on fields of inner_grid
+        mat,inner_mat,inner_grid=mat
+        assert(src != psi)
+        self.history = []
+        verbose=g.default.is_verbose("defect_correcting")
+        t0=g.time()
+        # inner fields are kept across calls
+        key=(inner_grid.obj,src.otype.__name__)
+        if not key in self.fields:
+            self.fields[key]=(g.lattice(inner_grid,src.otype),g.lattice(inner_grid,src.otype))
+        r_inner,x_inner=self.fields[key]
+        r,mmp=g.lattice(src),g.lattice(src)
+        ssq = g.norm2(src)
+        rsq = self.eps**2. * ssq
+        for k in range(1,self.maxiter+1):
+            mat(psi, mmp)
+            r2=g.axpy_norm2(r, -1.0, mmp, src)
+            self.history.append(r2)
+            if verbose:
+                g.message("res^2[ %d ] = %g" % (k,r2))
+            if r2 <= rsq:
+                if verbose:
+                    t1=g.time()
+                    g.message("Converged in %g s" % (t1-t0))
+                break
+            g.convert(r_inner, r)
+            x_inner[:]=0
+            x_inner.checkerboard(r.checkerboard())
+            self.inner(inner_mat, r_inner, x_inner)
+            g.convert(mmp, x_inner)
+            psi += mmp
@@ -79,7 +79,7 @@ class fgcr:
             t3 = time()
 
             t4 = time()
-            g.orthogonalize(mmp[i], mmp[0:i], beta[:, i])
+            g.orthogonalize(mmp[i], mmp[0:i], beta[:, i], block = True)
             t5 = time()
 
             t6 = time()
@@ -135,8 +135,7 @@ class fgcr:
         for j in reversed(range(i + 1)):
             delta[j] = (alpha[j] - np.dot(beta[j, j+1:i+1], delta[j+1:i+1])) / gamma[j]
 
-        for j in range(i + 1):
-            psi += delta[j] * p[j]
+        g.eval_many([(psi, delta[j] * p[j], True) for j in range(i + 1)])
 
     def restart(self, mat, psi, mmpsi, src, r):
         return self.calc_res(mat, psi, mmpsi, src, r)
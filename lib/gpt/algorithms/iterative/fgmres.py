@@ -82,7 +82,7 @@ class fgmres:
             t3 = time()
 
             t4 = time()
-            g.orthogonalize(V[i + 1], V[0:i + 1], H[:, i])
+            g.orthogonalize(V[i + 1], V[0:i + 1], H[:, i], block = True)
             t5 = time()
 
             t6 = time()
@@ -163,8 +163,7 @@ class fgmres:
         for j in reversed(range(i + 1)):
             y[j] = (gamma[j] - np.dot(H[j, j+1:i+1], y[j+1:i+1])) / H[j, j]
 
-        for j in range(i + 1):
-            psi += y[j] * V[j]
+        g.eval_many([(psi, y[j] * V[j], True) for j in range(i + 1)])
 
     def restart(self, mat, psi, mmpsi, src, r, V, gamma):
         r2 = self.calc_res(mat, psi, mmpsi, src, r)
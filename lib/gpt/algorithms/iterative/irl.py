@@ -256,7 +256,7 @@ class irl:
 
             t2=g.time()
             if k>0:
-                g.orthogonalize(w,evec[0:k])
+                g.orthogonalize(w,evec[0:k],block=True)
             t3=g.time()
 
             ckpt.save([w,alph,beta])
@@ -0,0 +1,76 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt as g
+
+class multi_shift_cg:
+
+    # solves (mat + shifts[i]) psi[i] = src for all shifts in the Krylov
+    # space of the smallest shift, the solutions start from zero
+    def __init__(self, params):
+        self.params = params
+        self.eps = params["eps"]
+        self.maxiter = params["maxiter"]
+        self.shifts = params["shifts"]
+        self.history = None
+
+    def __call__(self, mat, src, psi):
+        ns=len(self.shifts)
+        assert(ns == len(psi) and all([ src != x for x in psi ]))
+        self.history = []
+        verbose=g.default.is_verbose("multi_shift_cg")
+        t0=g.time()
+        s0=min(self.shifts)
+        p,mmp,r=g.copy(src),g.copy(src),g.copy(src)
+        ps=[ g.copy(src) for s in self.shifts ]
+        for x in psi:
+            x[:]=0
+        z,zp=[ 1.0 ] * ns,[ 1.0 ] * ns
+        ap,bp=1.0,0.0
+        cp = g.norm2(r)
+        ssq = cp
+        rsq = self.eps**2. * ssq
+        active=list(range(ns))
+        for k in range(1,self.maxiter+1):
+            mat(p, mmp)
+            if s0 != 0.0:
+                mmp += s0*p
+            d=g.innerProduct(p,mmp).real
+            a = cp / d
+            c=g.axpy_norm2(r, -a, mmp, r)
+            b = c / cp
+            updates=[]
+            for i in active:
+                # residual of shift i is z[i]*r
+                zn=z[i]*zp[i]*ap/(a*bp*(zp[i]-z[i])+zp[i]*ap*(1.0+(self.shifts[i]-s0)*a))
+                ai=a*zn/z[i]
+                bi=b*(zn/z[i])**2.
+                updates+=[ (psi[i], ai*ps[i], True), (ps[i], zn*r + bi*ps[i], False) ]
+                zp[i],z[i]=z[i],zn
+            g.eval_many(updates)
+            p @= b*p+r
+            ap,bp,cp=a,b,c
+            self.history.append(cp)
+            active=[ i for i in active if abs(z[i])**2. * cp > rsq ]
+            if verbose:
+                g.message("res^2[ %d ] = %g, %d of %d shifts active" % (k,cp,len(active),ns))
+            if len(active) == 0:
+                if verbose:
+                    t1=g.time()
+                    g.message("Converged in %g s" % (t1-t0))
+                break
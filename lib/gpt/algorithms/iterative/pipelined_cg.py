@@ -0,0 +1,71 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt as g
+
+class pipelined_cg:
+
+    # cg of Ghysels and Vanroose, both inner products of an iteration are
+    # taken in a single global sum that overlaps with the application of mat;
+    # same parameters, convergence criterion and history as cg
+    def __init__(self, params):
+        self.params = params
+        self.eps = params["eps"]
+        self.maxiter = params["maxiter"]
+        self.history = None
+
+    def __call__(self, mat, src, psi):
+        assert(src != psi)
+        self.history = []
+        verbose=g.default.is_verbose("pipelined_cg")
+        t0=g.time()
+        r,w,q,z,s,p=[ g.copy(src) for i in range(6) ]
+        mat(psi,q) # in, out
+        r @= src - q
+        mat(r,w)
+        z[:]=0
+        s[:]=0
+        p[:]=0
+        ssq = g.norm2(src)
+        rsq = self.eps**2. * ssq
+        cp,a = 0.0,0.0
+        for k in range(0,self.maxiter+1):
+            # (r,r) and (w,r) in a single non-blocking global sum
+            req=src.grid.globalsum(g.rank_inner_product([ r, w ], [ r ]), blocking = False)
+            mat(w, q)
+            ip=req.wait()
+            c,d=ip[0].real,ip[1].real
+            if k > 0:
+                self.history.append(c)
+                if verbose:
+                    g.message("res^2[ %d ] = %g" % (k,c))
+                if c <= rsq:
+                    if verbose:
+                        t1=g.time()
+                        g.message("Converged in %g s" % (t1-t0))
+                    break
+                if k == self.maxiter:
+                    break
+                b = c / cp
+                a = c / (d - b * c / a)
+            else:
+                b = 0.0
+                a = c / d
+            g.eval_many([ (z, q + b*z, False), (s, w + b*s, False), (p, r + b*p, False) ])
+            g.eval_many([ (psi, a*p, True), (r, r - a*s, False), (w, w - a*z, False) ])
+            cp = c
@@ -17,23 +17,27 @@
 #    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 from gpt.core.grid import grid, full, redblack, str_to_checkerboarding
-from gpt.core.precision import single, double, str_to_precision
-from gpt.core.lattice import lattice, meminfo
+from gpt.core.precision import single, double, bfp16, str_to_precision
+from gpt.core.compressed import compressed
+from gpt.core.batch import batch, rank_inner_product
+from gpt.core.lattice import lattice, meminfo, mem_usage, mem_pool_trim
 from gpt.core.tensor import tensor
 from gpt.core.gamma import gamma, gamma_base
 from gpt.core.time import time
 from gpt.core.log import message
-from gpt.core.transform import cshift, copy, convert, norm2, innerProduct, innerProductNorm2, axpy_norm2, slice
+from gpt.core.transform import cshift, shifted, copy, convert, norm2, innerProduct, innerProductNorm2, axpy_norm2, slice
 from gpt.core.checkerboard import pick_cb, set_cb, even, odd, none, str_to_cb
 from gpt.core.expr import expr, expr_unary, factor_unary
-from gpt.core.operators import expr_eval, adj, transpose, conj, trace, sum, apply_expr_unary
+from gpt.core.expression_block import expression_block
+from gpt.core.operators import expr_eval, expr_reduce, eval_many, adj, transpose, conj, trace, sum, apply_expr_unary
 from gpt.core.otype import *
 from gpt.core.mpi import *
 from gpt.core.io import load, crc32, save, format, mview, FILE, LoadError
 from gpt.core.checkpointer import checkpointer, checkpointer_none
-from gpt.core.basis import orthogonalize, linear_combination, rotate, qr_decomp
+from gpt.core.basis import orthogonalize, inner_products, linear_combination, rotate, qr_decomp
 from gpt.core.cartesian import cartesian_view
-from gpt.core.coordinates import coordinates
+from gpt.core.coordinates import coordinates, coordinates_cache_stats
 from gpt.core.random import random, sha256
 import gpt.core.util
+import gpt.core.eval_plan
 import gpt.core.block
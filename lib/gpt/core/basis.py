@@ -19,8 +19,29 @@
 
 import gpt
 import cgpt
+from gpt.core.compressed import compressed_linear_combination, compressed_rotate
+from gpt.core.batch import rank_inner_product
 
-def orthogonalize(w,basis,ips=None):
+def inner_products(basis,w):
+    # <basis[i],w> for all i from a single sweep and a single global sum
+    ip=rank_inner_product(basis,[ w ])
+    w.grid.globalsum(ip)
+    return ip
+
+def orthogonalize(w,basis,ips=None,block=False):
+    if block and len(basis) > 0 and all([ type(v) == gpt.lattice for v in basis ]):
+        # classical Gram-Schmidt with one reorthogonalization, each pass takes
+        # a sweep for all inner products and one for the linear combination
+        n=len(basis)
+        ip_sum=0.0
+        for i in range(2):
+            ip=inner_products(basis,w)
+            gpt.eval_many([ (w, gpt.expr([ (1.0, [ (gpt.factor_unary.NONE,w) ]) ] +
+                                         [ (complex(-ip[j]), [ (gpt.factor_unary.NONE,v) ]) for j,v in enumerate(basis) ]), False) ])
+            ip_sum=ip_sum + ip
+        if ips is not None:
+            ips[0:n]=ip_sum
+        return
     for j, v in enumerate(basis):
         ip=gpt.innerProduct(v,w)
         w -= ip*v
@@ -28,11 +49,15 @@ def orthogonalize(w,basis,ips=None):
             ips[j]=ip
 
 def linear_combination(r,basis,Qt):
+    if any([ type(b) == gpt.compressed for b in basis ]):
+        return compressed_linear_combination(r,basis,Qt)
     assert(len(basis[0].v_obj) == len(r.v_obj))
     for i in r.otype.v_idx:
         cgpt.linear_combination(r.v_obj[i],basis,Qt,i)
 
 def rotate(basis,Qt,j0,j1,k0,k1):
+    if any([ type(b) == gpt.compressed for b in basis ]):
+        return compressed_rotate(basis,Qt,j0,j1,k0,k1)
     for i in basis[0].otype.v_idx:
         cgpt.rotate(basis,Qt,j0,j1,k0,k1,i)
 
@@ -0,0 +1,114 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt
+import cgpt
+import numpy
+
+# Batch of lattices with the same grid and otype
+#
+# Reductions of a batch return numpy arrays with one entry per member and
+# take a single global sum for all members.
+class batch:
+    def __init__(self, first, n = None):
+        if type(first) == list:
+            self.lattices = first
+        else:
+            assert(type(first) == gpt.lattice and not n is None)
+            self.lattices = [ gpt.lattice(first) for i in range(n) ]
+        self.grid = self.lattices[0].grid
+        self.otype = self.lattices[0].otype
+        assert(all([ l.grid.obj == self.grid.obj and l.otype.__name__ == self.otype.__name__ for l in self.lattices ]))
+
+    def __len__(self):
+        return len(self.lattices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return batch(self.lattices[i])
+        return self.lattices[i]
+
+    def __iter__(self):
+        return iter(self.lattices)
+
+    def __setitem__(self, key, value):
+        for l in self.lattices:
+            l[key]=value
+
+    def checkerboard(self, val = None):
+        if val is None:
+            return self.lattices[0].checkerboard()
+        for l in self.lattices:
+            l.checkerboard(val)
+
+    def __repr__(self):
+        return "batch(%d,%s,%s)" % (len(self),self.otype.__name__,self.grid.precision.__name__)
+
+def members(x, n):
+    if type(x) == batch:
+        assert(len(x) == n)
+        return x.lattices
+    return [ x ] * n
+
+def as_lattices(x):
+    if type(x) == batch:
+        return x.lattices
+    if type(x) == gpt.lattice:
+        return [ x ]
+    if type(x) != list or not all([ type(l) == gpt.lattice for l in x ]):
+        raise Exception("Batched inner products need lattices, lists or batches of lattices")
+    return x
+
+def rank_inner_product(a, b, diagonal = False):
+    # local part of <a[i],b[j]> as matrix, or of <a[i],b[i]> if diagonal;
+    # a single lattice is paired with all members of the other operand
+    a=as_lattices(a)
+    b=as_lattices(b)
+    if diagonal and len(a) != len(b):
+        if len(a) == 1:
+            a=a * len(b)
+        elif len(b) == 1:
+            b=b * len(a)
+        else:
+            raise Exception("Batches of different size %d and %d" % (len(a),len(b)))
+    return sum([ cgpt.lattice_rank_inner_product(a,b,diagonal,i) for i in a[0].otype.v_idx ])
+
+def batch_eval(dst, first, ac = False):
+    # first is a list of expressions, one per member of dst
+    assert(len(first) == len(dst))
+    gpt.eval_many([ (d, first[i], ac) for i,d in enumerate(dst) ])
+    return dst
+
+def batch_norm2(l):
+    r=rank_inner_product(l,l,True)
+    l.grid.globalsum(r)
+    return r.real
+
+def batch_innerProduct(a, b):
+    r=rank_inner_product(a,b,True)
+    (a if type(a) == batch else b).grid.globalsum(r)
+    return r
+
+def batch_axpy_norm2(d, a, x, y):
+    # d[i] = a[i]*x[i] + y[i], returns norm2 of all d[i]
+    n=len(d)
+    a=[ a ] * n if gpt.util.isnum(a) else a
+    x=members(x,n)
+    y=members(y,n)
+    gpt.eval_many([ (d[i], complex(a[i])*x[i] + y[i], False) for i in range(n) ])
+    return batch_norm2(d)
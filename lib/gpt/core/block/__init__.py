@@ -18,6 +18,7 @@
 #
 import gpt,cgpt,sys
 from gpt.core.block.operator import operator
+from gpt.core.block.compressed_evec import compressed_evec
 
 def grid(fgrid, nblock):
     assert(fgrid.nd == len(nblock))
@@ -27,24 +28,20 @@ def grid(fgrid, nblock):
     return gpt.grid([ fgrid.gdimensions[i] // nblock[i] for i in range(fgrid.nd) ],fgrid.precision,gpt.full)
 
 def project(coarse, fine, basis):
-    cot=coarse.otype
-    fot=fine.otype
-    tmp=gpt.lattice(coarse)
-    coarse[:]=0
-    for j in fot.v_idx:
-        for i in cot.v_idx:
-            cgpt.block_project(tmp.v_obj[i],fine.v_obj[j],basis[cot.v_n0[i]:cot.v_n1[i]],j)
-        coarse += tmp
+    # all coarse components in a single sweep per fine component,
+    # a compressed basis is decompressed site by site
+    f=cgpt.block_project_compressed if type(basis[0]) == gpt.compressed else cgpt.block_project
+    for j in fine.otype.v_idx:
+        f(coarse.overwrite() if j == 0 else coarse.v_obj,fine.v_obj[j],basis,j,j > 0)
 
 def promote(coarse, fine, basis):
-    cot=coarse.otype
-    fot=fine.otype
-    tmp=gpt.lattice(fine)
-    fine[:]=0
-    for i in cot.v_idx:
-        for j in fot.v_idx:
-            cgpt.block_promote(coarse.v_obj[i],tmp.v_obj[j],basis[cot.v_n0[i]:cot.v_n1[i]],j)
-        fine += tmp
+    # all coarse components in a single sweep per fine component,
+    # a compressed basis is decompressed site by site
+    f=cgpt.block_promote_compressed if type(basis[0]) == gpt.compressed else cgpt.block_promote
+    for j in fine.otype.v_idx:
+        f(coarse.v_obj,fine.overwrite()[j],basis,j)
+    if type(basis[0]) == gpt.compressed:
+        fine.checkerboard(basis[0].checkerboard())
 
 def orthonormalize(coarse_grid, basis):
     assert(type(coarse_grid) == gpt.grid)
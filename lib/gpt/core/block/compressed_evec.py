@@ -0,0 +1,80 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt
+from gpt.core.compressed import decompressed
+
+# Eigenvectors represented by a fine block basis and coarse coefficients
+#
+# The fine vectors are promoted on demand, the most recently used ones are
+# kept in a small cache.  Indexing returns the cached vector, which must
+# not be modified by the caller.  Inner products with fine fields and deflation only
+# need a single projection or promotion.  The basis can be kept in a
+# compressed storage precision, the block kernels then decompress it site
+# by site.
+class compressed_evec:
+    def __init__(self, basis, coarse, precision = None, cache_size = 4):
+        self.basis = basis if precision is None else gpt.convert(basis,precision)
+        self.coarse = coarse
+        self.cache_size = cache_size
+        self.cache = {}
+        self.verbose = gpt.default.is_verbose("deflate")
+
+    def project(self, src, dst = None):
+        if dst is None:
+            dst = gpt.lattice(self.coarse[0])
+        gpt.block.project(dst,src,self.basis)
+        return dst
+
+    def promote(self, src, dst = None):
+        if dst is None:
+            dst = gpt.lattice(self.basis[0].grid,self.basis[0].otype)
+        gpt.block.promote(src,dst,self.basis)
+        return dst
+
+    def coarse_inner_products(self, c):
+        # <n|c> for all coarse vectors n with a single global sum
+        if all([ type(n) == gpt.lattice for n in self.coarse ]):
+            return gpt.inner_products(self.coarse,c)
+        return [ gpt.innerProduct(n,c) for n in self.coarse ]
+
+    def inner_products(self, src):
+        # <n|src> for all eigenvectors n, uses a single projection of src
+        return self.coarse_inner_products(self.project(src))
+
+    def __len__(self):
+        return len(self.coarse)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return compressed_evec(self.basis, self.coarse[i], cache_size = self.cache_size)
+        if i in self.cache:
+            v=self.cache.pop(i)
+        else:
+            t0=gpt.time()
+            v=self.promote(decompressed(self.coarse[i]))
+            if self.verbose:
+                gpt.message("Promoted eigenvector %d in %g s" % (i,gpt.time()-t0))
+            while len(self.cache) >= max(self.cache_size,1):
+                del self.cache[next(iter(self.cache))]
+        self.cache[i]=v # most recently used last
+        return v
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,109 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt
+import cgpt
+import numpy
+from gpt.core.precision import bfp16
+from gpt.core.lattice import mem_book, mem_site, mem_site_allocate, mem_site_release
+
+# Lattices in compressed storage precision
+#
+# Only storage is compressed, all arithmetic is done in the precision of
+# the original grid.  linear_combination and rotate decompress per site in
+# cgpt and need no full-precision temporaries.  In an expression each
+# compressed operand is decompressed to one temporary lattice that lives as
+# long as the expression, so the peak memory of an expression is one full
+# lattice per compressed operand.
+class compressed:
+    def __init__(self, l, precision = bfp16):
+        assert(precision == bfp16)
+        self.grid = l.grid
+        self.otype = l.otype
+        self.precision = precision
+        self.cb = l.checkerboard()
+        self.v_obj = [ cgpt.create_compressed(o) for o in l.v_obj ]
+        site=mem_site()
+        nbytes=sum([ cgpt.compressed_nbytes(o) for o in self.v_obj ])
+        mem_site_allocate(site,nbytes)
+        mem_book[self.v_obj[0]] = (self.grid,self.otype,self.precision,gpt.time(),site,nbytes)
+
+    def __del__(self):
+        grid,otype,precision,created,site,nbytes = mem_book[self.v_obj[0]]
+        mem_site_release(site,nbytes)
+        del mem_book[self.v_obj[0]]
+        for o in self.v_obj:
+            cgpt.delete_compressed(o)
+
+    def checkerboard(self):
+        return self.cb
+
+    def decompress(self, dst = None):
+        if dst is None:
+            dst = gpt.lattice(self.grid, self.otype)
+        assert(dst.grid.obj == self.grid.obj and len(dst.v_obj) == len(self.v_obj))
+        for i,o in enumerate(self.v_obj):
+            cgpt.decompress(o, dst.v_obj[i])
+        dst.checkerboard(self.cb)
+        return dst
+
+    def __repr__(self):
+        return "compressed(%s,%s)" % (self.otype.__name__,self.precision.__name__)
+
+    def __rmul__(self, l):
+        return gpt.expr(l) * gpt.expr(self)
+
+    def __mul__(self, l):
+        return gpt.expr(self) * gpt.expr(l)
+
+    def __truediv__(self, l):
+        assert(gpt.util.isnum(l))
+        return gpt.expr(self) * (1.0/l)
+
+    def __add__(self, l):
+        return gpt.expr(self) + gpt.expr(l)
+
+    def __sub__(self, l):
+        return gpt.expr(self) - gpt.expr(l)
+
+    def __neg__(self):
+        return gpt.expr(self) * (-1.0)
+
+def decompressed(x):
+    # lattice for x, decompressed on the fly if needed
+    if type(x) == compressed:
+        return x.decompress()
+    return x
+
+def compressed_linear_combination(r, basis, Qt):
+    # r = sum_k Qt[k] basis[k], compressed vectors are decompressed per site
+    c=[ k for k in range(len(basis)) if type(basis[k]) == compressed ]
+    qc=numpy.array([ Qt[k] for k in c ],dtype=numpy.float64)
+    for i in r.otype.v_idx:
+        cgpt.compressed_linear_combination(r.overwrite()[i],[ basis[k] for k in c ],qc,i)
+    l=[ k for k in range(len(basis)) if type(basis[k]) != compressed ]
+    if len(l) > 0:
+        gpt.eval_many([ (r, gpt.expr([ (complex(Qt[k]), [ (gpt.factor_unary.NONE,basis[k]) ]) for k in l ]), True) ])
+
+def compressed_rotate(basis, Qt, j0, j1, k0, k1):
+    # basis[j] = sum_k Qt[j,k] basis[k] for j0 <= j < j1 and k0 <= k < k1,
+    # in place on the compressed storage without lattice temporaries
+    if not all([ type(b) == compressed for b in basis ]):
+        raise Exception("Rotation of a basis mixing compressed and uncompressed vectors is not supported")
+    for i in range(len(basis[0].v_obj)):
+        cgpt.compressed_rotate(basis,Qt,j0,j1,k0,k1,i)
@@ -18,6 +18,40 @@
 #
 import gpt
 import cgpt
+import numpy
+
+# Coordinate arrays are read-only, cgpt attaches the distribution plans of
+# lattice_import/lattice_export to them.  Keep recently used arrays alive
+# so that repeated imports/exports with the same coordinates reuse them.
+cache={}
+stats={ "hits" : 0, "misses" : 0 }
+
+def cached(key, create):
+    if key in cache:
+        stats["hits"]+=1
+        c=cache.pop(key)
+    else:
+        stats["misses"]+=1
+        c=create()
+        while len(cache) >= max(gpt.default.max_coordinate_cache,1):
+            del cache[next(iter(cache))]
+    cache[key]=c # most recently used last
+    return c
+
+def cartesian_view(top,bottom,checker_dim_mask,cb):
+    return cached(("view",tuple(top),tuple(bottom),tuple(checker_dim_mask),cb),
+                  lambda: cgpt.coordinates_form_cartesian_view(top,bottom,checker_dim_mask,cb))
+
+def point(coor):
+    def create():
+        a=numpy.array([ coor ],dtype=numpy.int32)
+        a.setflags(write=False)
+        return a
+    return cached(("point",tuple([ int(x) for x in coor ])),create)
+
+def coordinates_cache_stats():
+    # hits and misses of the coordinate cache and of the cgpt distribution plans
+    return { "coordinates" : dict(stats), "plans" : cgpt.grid_cached_stats() }
 
 def coordinates(o):
     if type(o) == gpt.grid and o.cb == gpt.full:
@@ -25,15 +59,15 @@ def coordinates(o):
         top=[ o.processor_coor[i]*o.ldimensions[i] for i in range(dim) ]
         bottom=[ top[i] + o.ldimensions[i] for i in range(dim) ]
         checker_dim_mask=[ 0 ] * dim
-        return cgpt.coordinates_form_cartesian_view(top,bottom,checker_dim_mask,None)
+        return cartesian_view(top,bottom,checker_dim_mask,None)
     if type(o) == gpt.lattice:
         dim=len(o.ldimensions)
         cb=o.cb.tag
         cbf=[ o.fdimensions[i] // o.gdimensions[i] for i in range(dim) ]
         top=[ o.processor_coor[i]*o.ldimensions[i]*cbf[i] for i in range(dim) ]
         bottom=[ top[i] + o.ldimensions[i]*cbf[i] for i in range(dim) ]
-        return cgpt.coordinates_form_cartesian_view(top,bottom,[ 1 ] * dim,cb)
+        return cartesian_view(top,bottom,[ 1 ] * dim,cb)
     elif type(o) == gpt.cartesian_view:
-        return cgpt.coordinates_form_cartesian_view(o.top,o.bottom,o.checker_dim_mask,o.cb)
+        return cartesian_view(o.top,o.bottom,o.checker_dim_mask,o.cb)
     else:
         assert(0)
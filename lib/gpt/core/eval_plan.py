@@ -0,0 +1,188 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import cgpt
+import gpt
+
+# Evaluation plans
+#
+# The structure of an expression (factor kinds, unary flags, tensor
+# otypes, gamma matrices) is independent of the operands it is
+# evaluated on.  It is converted and simplified once by cgpt and
+# re-used for all expressions with the same structure; only the
+# operands and coefficients are bound for each evaluation.
+
+class eval_plan:
+    def __init__(self, structure, unary, e):
+        self.obj = cgpt.create_eval_plan(structure, unary)
+        self.hits = 0
+        self.otype = None # otype of result, known after first evaluation into a new lattice
+        self.desc = str(e)
+        self.flops_per_site,self.words_per_site,self.result_words_per_site = cost(e)
+        self.calls = 0
+        self.time = 0.0
+        self.flops = 0.0
+        self.bytes = 0.0
+
+    def account(self, grid, dt, ac):
+        # ac == None for reductions which do not write a result
+        sites = grid.gsites / grid.cb.n
+        words = self.words_per_site
+        if not ac is None:
+            words += self.result_words_per_site * (2 if ac else 1)
+        flops = self.flops_per_site * sites
+        nbytes = words * grid.precision.nbytes * sites
+        self.calls += 1
+        self.time += dt
+        self.flops += flops
+        self.bytes += nbytes
+        return flops,nbytes
+
+    def __del__(self):
+        cgpt.delete_eval_plan(self.obj)
+
+    def __call__(self, dst, operands, coefficients, ac, idx):
+        return cgpt.execute_eval_plan(self.obj, dst, operands, coefficients, ac, idx)
+
+cache = {}
+stats = { "hits" : 0, "misses" : 0 }
+
+# Analytic cost model
+#
+# Flops and real words moved per site for the way cgpt evaluates an
+# expression: products are formed from right to left in temporaries
+# and all terms are combined in a linear combination.
+def elements(otype):
+    return otype.nfloats // 2
+
+def mul_cost(a, b):
+    # returns otype of a*b and flops per site, gamma matrices are None
+    if a is None:
+        return b,0
+    if b is None:
+        return a,0
+    if a.__name__ == "ot_complex":
+        return b,6*elements(b)
+    if b.__name__ == "ot_complex":
+        return a,6*elements(a)
+    for tab in [ gpt.otype.mtab, gpt.otype.itab ]:
+        if (a,b) in tab:
+            ot,axes=tab[(a,b)]
+            axes=axes[0] if type(axes[0]) == list else [ axes[0] ]
+            contracted=1
+            for x in axes:
+                contracted*=a.shape[x]
+            return ot,8*elements(ot)*contracted
+    if (a,b) in gpt.otype.otab:
+        ot=gpt.otype.otab[(a,b)][0]
+        return ot,6*elements(ot)
+    return b,8*elements(b)
+
+def trace_otype(otype, unary):
+    for bit,tr in [ (gpt.expr_unary.BIT_SPINTRACE,"spintrace"), (gpt.expr_unary.BIT_COLORTRACE,"colortrace") ]:
+        if unary & bit and not getattr(otype,tr,None) is None and not getattr(otype,tr)[2] is None:
+            otype=getattr(otype,tr)[2]
+    return otype
+
+def cost(e):
+    flops=0
+    words=0
+    result=None
+    for coef,factors in e.val:
+        ot=None
+        for j,(unary,f) in enumerate(reversed(factors)):
+            fo=None if type(f) == gpt.gamma_base else f.otype
+            if type(f) == gpt.lattice:
+                words+=fo.nfloats
+            elif type(f) == gpt.shifted:
+                words+=3*fo.nfloats # shifted copy written and read
+            if j == 0:
+                ot=fo
+            else:
+                ot,fl=mul_cost(fo,ot)
+                flops+=fl
+                words+=2*ot.nfloats # temporary written and read
+        if ot is None:
+            continue
+        if e.unary != gpt.expr_unary.NONE:
+            flops+=2*elements(ot)
+            ot=trace_otype(ot,e.unary)
+        flops+=8*elements(ot) # linear combination
+        result=ot
+    return flops,words,0 if result is None else result.nfloats
+
+def report(n = 10):
+    # rank expression shapes of this run by total evaluation time
+    plans=sorted(cache.values(), key = lambda p: -p.time)[0:n]
+    fmt=" %-12s %-10s %-12s %-12s %s"
+    gpt.message("==========================================================================================================================")
+    gpt.message("                                                 GPT Expression Evaluation Report")
+    gpt.message("==========================================================================================================================")
+    gpt.message(fmt % ("Time/s","Calls","GFlops/s","GB/s","Expression"))
+    for p in plans:
+        dt=p.time if p.time > 0.0 else float("nan")
+        gpt.message(fmt % ("%g" % p.time,p.calls,"%g" % (p.flops/dt/1e9),"%g" % (p.bytes/dt/1e9),p.desc))
+    gpt.message("==========================================================================================================================")
+
+def signature(e):
+    # shifted factors are materialized once per distinct (lattice, dir, disp)
+    # in storage from the memory pool, the caller keeps them until the plan
+    # has been executed
+    structure=[]
+    operands=[]
+    coefficients=[]
+    shifts={}
+    for coef,factors in e.val:
+        term=[]
+        for unary,f in factors:
+            if type(f) == gpt.lattice:
+                term.append( (unary,0,f.otype.__name__) )
+                operands.append(f.v_obj)
+            elif type(f) == gpt.shifted:
+                term.append( (unary,3,(f.otype.__name__,f.dir,f.disp)) )
+                key=(id(f.lattice),f.dir,f.disp)
+                if not key in shifts:
+                    shifts[key]=gpt.cshift(f.lattice,f.dir,f.disp)
+                operands.append(shifts[key].v_obj)
+            elif type(f) == gpt.tensor:
+                term.append( (unary,1,f.otype) )
+                operands.append(f.array)
+            elif type(f) == gpt.gamma_base:
+                term.append( (unary,2,f.gamma) )
+            else:
+                raise Exception("Unknown factor type " + str(type(f)))
+        structure.append(tuple(term))
+        coefficients.append(coef)
+    return (e.unary,tuple(structure)),operands,coefficients,list(shifts.values())
+
+def get(e):
+    key,operands,coefficients,shifts=signature(e)
+    plan=cache.get(key)
+    if plan is None:
+        stats["misses"] += 1
+        if len(cache) >= gpt.default.max_eval_plans:
+            cache.clear()
+        plan=eval_plan([ list(t) for t in key[1] ], key[0], e)
+        cache[key]=plan
+    else:
+        stats["hits"] += 1
+        plan.hits += 1
+    return plan,operands,coefficients,shifts
+
+def clear():
+    cache.clear()
@@ -37,10 +37,55 @@ class expr_unary:
 # - each factor is a lattice/object with optional factor_unary operation applied
 # - an object could be a spin or a gauge matrix
 
+def product(lhs, rhs):
+    return [ (a[0]*b[0], a[1] + b[1]) for a in lhs for b in rhs ]
+
+def eval_cost(val):
+    # number of lattice temporaries created by cgpt to evaluate the terms
+    return sum([ max(len(t[1]) - 1, 0) for t in val ])
+
+# cgpt evaluates products in chunks of this many terms
+eval_chunk = 7
+
+def eval_peak(val):
+    # number of product temporaries alive at the same time in cgpt
+    return min(len([ t for t in val if len(t[1]) > 1 ]), eval_chunk)
+
+closed = [ (1.0, [ (factor_unary.NONE,None) ]) ]
+
+def distribution_strategy(lhs, rhs):
+    # Choose which operands to close before forming the product, avoiding
+    # exponential growth of terms beyond gpt.default.expr_max_terms.
+    # Strategies are ranked by the peak number of live temporaries first,
+    # a closed operand stays alive until the product is evaluated, and by
+    # the total number of temporaries second.
+    best = None
+    for close_lhs in ([ False, True ] if len(lhs) > 1 else [ False ]):
+        for close_rhs in ([ False, True ] if len(rhs) > 1 else [ False ]):
+            l = closed if close_lhs else lhs
+            r = closed if close_rhs else rhs
+            n = len(l)*len(r)
+            if n > 1 and n > gpt.default.expr_max_terms:
+                continue
+            cost = eval_cost(product(l,r))
+            peak = 0
+            live = 0
+            for c,o in [ (close_lhs,lhs), (close_rhs,rhs) ]:
+                if c:
+                    cost += eval_cost(o) + 1
+                    peak = max(peak, live + eval_peak(o))
+                    live += 1
+            peak = max(peak, live + eval_peak(product(l,r)))
+            if best is None or (peak,cost) < best[0]:
+                best = ((peak,cost),close_lhs,close_rhs)
+    return best[1],best[2]
+
 class expr:
     def __init__(self, val, unary = expr_unary.NONE):
-        if type(val) in [ gpt.lattice, gpt.gamma_base, gpt.tensor ]:
+        if type(val) in [ gpt.lattice, gpt.gamma_base, gpt.tensor, gpt.shifted ]:
             self.val = [ (1.0, [ (factor_unary.NONE,val) ]) ]
+        elif type(val) == gpt.compressed:
+            self.val = [ (1.0, [ (factor_unary.NONE,val.decompress()) ]) ]
         elif type(val) == expr:
             self.val = val.val
             unary = unary | val.unary
@@ -66,13 +111,13 @@ class expr:
         if type(l) == expr:
             lhs = gpt.apply_expr_unary(self)
             rhs = gpt.apply_expr_unary(l)
-            # close before product to avoid exponential growth of terms
-            if len(lhs.val) > 1:
+            # distribute the product unless closing an operand is cheaper
+            close_lhs,close_rhs = distribution_strategy(lhs.val,rhs.val)
+            if close_lhs:
                 lhs=expr(gpt.eval(lhs))
-            if len(rhs.val) > 1:
+            if close_rhs:
                 rhs=expr(gpt.eval(rhs))
-            assert(len(lhs.val) == 1 or len(rhs.val) == 1)
-            return expr( [ (a[0]*b[0], a[1] + b[1]) for a in lhs.val for b in rhs.val ] )
+            return expr( product(lhs.val,rhs.val) )
         elif type(l) == gpt.tensor and self.is_single(gpt.tensor):
             ue,uf,to=self.get_single()
             if ue == 0 and uf & factor_unary.BIT_TRANS != 0:
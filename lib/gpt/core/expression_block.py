@@ -0,0 +1,181 @@
+#
+#    GPT - Grid Python Toolkit
+#    Copyright (C) 2020  Christoph Lehner (christoph.lehner@ur.de, https://github.com/lehner/gpt)
+#
+#    This program is free software; you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation; either version 2 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License along
+#    with this program; if not, write to the Free Software Foundation, Inc.,
+#    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+import gpt
+
+# Expression blocks
+#
+# Statements recorded in a block are evaluated when the block is
+# executed (at the end of a with statement).  Before evaluation,
+# shifted factors and sub-products (right-most factors of a term, which
+# cgpt evaluates first) that occur in more than one term are replaced by
+# temporaries.  Each temporary is computed before its first use and
+# released after its last use.  Lattices that are written by a statement
+# of the block are excluded from this.
+
+class expression_block_result:
+    def __init__(self):
+        self.value = None
+
+class temporary:
+    def __init__(self, definition):
+        self.definition = definition # shifted factor or list of factors
+
+def factor_key(unary, f):
+    if type(f) == gpt.lattice:
+        return ("l",id(f),unary)
+    elif type(f) == gpt.shifted:
+        return ("s",id(f.lattice),f.dir,f.disp,unary)
+    elif type(f) == gpt.tensor:
+        return ("t",id(f),unary)
+    elif type(f) == gpt.gamma_base:
+        return ("g",f.gamma,unary)
+    elif type(f) == temporary:
+        return ("p",id(f),unary)
+    assert(0)
+
+def lattices_of(f):
+    if type(f) == gpt.lattice:
+        return [ f ]
+    elif type(f) == gpt.shifted:
+        return [ f.lattice ]
+    elif type(f) == temporary:
+        if type(f.definition) == gpt.shifted:
+            return [ f.definition.lattice ]
+        return [ l for u,x in f.definition for l in lattices_of(x) ]
+    return []
+
+def temporaries_of(factors):
+    return [ f for u,f in factors if type(f) == temporary ]
+
+class expression_block:
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def eval(self, dst, first, ac = False):
+        self.statements.append( ("eval",dst,gpt.expr(first),ac) )
+
+    def sum(self, first):
+        r=expression_block_result()
+        self.statements.append( ("sum",r,gpt.expr(first),None) )
+        return r
+
+    def slice(self, first, dim):
+        r=expression_block_result()
+        self.statements.append( ("slice",r,gpt.expr(first),dim) )
+        return r
+
+    def eliminate(self, statements):
+        written=set([ id(s[1]) for s in statements if s[0] == "eval" ])
+        def shareable(factors):
+            return all([ not id(l) in written for u,f in factors for l in lattices_of(f) ])
+
+        # shifted factors
+        counts={}
+        for s in statements:
+            for coef,factors in s[2].val:
+                for u,f in factors:
+                    if type(f) == gpt.shifted and shareable([ (u,f) ]):
+                        key=factor_key(0,f)
+                        counts[key]=counts.get(key,0) + 1
+        shifts={}
+        for s in statements:
+            for coef,factors in s[2].val:
+                for j,(u,f) in enumerate(factors):
+                    if type(f) == gpt.shifted:
+                        key=factor_key(0,f)
+                        if counts.get(key,0) > 1:
+                            if not key in shifts:
+                                shifts[key]=temporary(f)
+                            factors[j]=(u,shifts[key])
+
+        # sub-products, largest savings first
+        while True:
+            counts={}
+            for s in statements:
+                for coef,factors in s[2].val:
+                    for k in range(len(factors)-1):
+                        suffix=factors[k:]
+                        if shareable(suffix) and any([ len(lattices_of(f)) > 0 for u,f in suffix ]):
+                            key=tuple([ factor_key(u,f) for u,f in suffix ])
+                            if not key in counts:
+                                counts[key]=[ 0, suffix ]
+                            counts[key][0] += 1
+            candidates=[ (c[0]-1)*(len(key)-1) for key,c in counts.items() if c[0] > 1 ]
+            if len(candidates) == 0:
+                break
+            best=max(candidates)
+            key,c=[ (key,c) for key,c in counts.items() if c[0] > 1 and (c[0]-1)*(len(key)-1) == best ][0]
+            t=temporary(list(c[1]))
+            n=len(key)
+            for s in statements:
+                for coef,factors in s[2].val:
+                    if len(factors) >= n and tuple([ factor_key(u,f) for u,f in factors[-n:] ]) == key:
+                        factors[-n:]=[ (gpt.factor_unary.NONE,t) ]
+
+    def execute(self):
+        # work on copies of the terms, expressions may be shared with the caller
+        statements=[ (kind,target,gpt.expr([ (coef,list(factors)) for coef,factors in e.val ],e.unary),arg)
+                     for kind,target,e,arg in self.statements ]
+        self.statements=[]
+        self.eliminate(statements)
+
+        # last use of temporaries, temporaries needed to compute others are used when those are computed
+        last_use={}
+        computed=set()
+        def use(ts, i):
+            for t in ts:
+                last_use[t]=i
+                if not t in computed:
+                    computed.add(t)
+                    if type(t.definition) == list:
+                        use(temporaries_of(t.definition), i)
+        for i,s in enumerate(statements):
+            use([ f for coef,factors in s[2].val for f in temporaries_of(factors) ], i)
+
+        values={}
+        def resolve(factors):
+            r=[]
+            for u,f in factors:
+                if type(f) == temporary:
+                    if not f in values:
+                        if type(f.definition) == gpt.shifted:
+                            values[f]=gpt.cshift(f.definition.lattice,f.definition.dir,f.definition.disp)
+                        else:
+                            values[f]=gpt.eval(gpt.expr([ (1.0,resolve(f.definition)) ]))
+                    f=values[f]
+                r.append( (u,f) )
+            return r
+
+        for i,(kind,target,e,arg) in enumerate(statements):
+            e=gpt.expr([ (coef,resolve(factors)) for coef,factors in e.val ], e.unary)
+            if kind == "eval":
+                gpt.eval(target,e,arg)
+            elif kind == "sum":
+                target.value=gpt.sum(e)
+            elif kind == "slice":
+                target.value=gpt.slice(e,arg)
+            for t in [ t for t in values if last_use[t] == i ]:
+                del values[t]
@@ -40,6 +40,16 @@ def str_to_checkerboarding(s):
     else:
         assert(0)
 
+class globalsum_request:
+    def __init__(self, grid, x):
+        self.x = x
+        self.obj = cgpt.grid_globalsum_start(grid.obj, x)
+
+    def wait(self):
+        # returns the globally summed array
+        cgpt.grid_globalsum_wait(self.obj)
+        return self.x
+
 class grid:
     def __init__(self, first, second = None, third = None, fourth = None):
         if type(first) == str:
@@ -87,7 +97,10 @@ class grid:
     def barrier(self):
         cgpt.grid_barrier(self.obj)
 
-    def globalsum(self, x):
+    def globalsum(self, x, blocking = True):
+        if not blocking:
+            # numpy arrays only, wait() on the returned request completes the sum
+            return globalsum_request(self, x)
         if type(x) == gpt.tensor:
             otype=x.otype
             cgpt.grid_globalsum(self.obj,x.array)
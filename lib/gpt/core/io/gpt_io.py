@@ -245,7 +245,7 @@ class gpt_io:
         # TODO:
         # split grid exposure, allow cgpt_distribute to be given a communicator
         # and take it in importexport.h, add debug info here
-        # more benchmarks, useful to create a plan for cgpt_distribute and cache? immutable numpy array returned from coordinates, attach plan
+        # more benchmarks
 
         return l
 
@@ -19,11 +19,111 @@
 import cgpt
 import gpt
 import numpy
+import sys
+from gpt.core.coordinates import point as coordinates_point
 
 mem_book = {
 }
 
-def meminfo():
+###
+# Allocation sites
+#
+# Lattices are attributed to the first calling function outside of
+# gpt.core (module:function).  For each site the live bytes per rank,
+# the peak bytes per rank and the number of allocations are recorded.
+mem_sites = {
+}
+
+mem_total = { "live" : 0, "peak" : 0, "count" : 0 }
+
+def mem_site():
+    f=sys._getframe(2)
+    while not f is None:
+        module=f.f_globals.get("__name__","")
+        if not module.startswith("gpt.core"):
+            return "%s:%s" % (module,f.f_code.co_name)
+        f=f.f_back
+    return "?"
+
+def mem_site_allocate(site, nbytes):
+    for rec in [ mem_sites.setdefault(site, { "live" : 0, "peak" : 0, "count" : 0 }), mem_total ]:
+        rec["live"] += nbytes
+        rec["count"] += 1
+        rec["peak"] = max(rec["peak"],rec["live"])
+
+def mem_site_release(site, nbytes):
+    mem_sites[site]["live"] -= nbytes
+    mem_total["live"] -= nbytes
+
+def mem_usage():
+    # returns total and per-site live/peak bytes per rank and allocation counts
+    return { "total" : dict(mem_total), "sites" : { site : dict(mem_sites[site]) for site in mem_sites } }
+
+###
+# Pool of lattice storage
+#
+# Storage of deleted lattices is kept in a pool keyed by
+# (grid, otype component, precision) and handed out again to new
+# lattices of the same kind.  The pool holds at most
+# gpt.default.mem_pool_max_gb per rank and can be trimmed explicitly.
+mem_pool = {
+}
+
+mem_pool_stats = { "hits" : 0, "misses" : 0, "bytes" : 0 }
+
+def mem_pool_bytes(grid, t):
+    ot = gpt.str_to_otype(t) if type(t) == str else t
+    return grid.gsites * grid.precision.nbytes * ot.nfloats / grid.cb.n / grid.Nprocessors
+
+def mem_pool_allocate(grid, t):
+    pool=mem_pool.get((grid.obj,t,grid.precision))
+    if pool:
+        mem_pool_stats["hits"] += 1
+        mem_pool_stats["bytes"] -= mem_pool_bytes(grid,t)
+        o=pool.pop()[1]
+        if grid.cb == gpt.redblack:
+            cgpt.lattice_change_checkerboard(o,gpt.even.tag)
+        return o
+    mem_pool_stats["misses"] += 1
+    return cgpt.create_lattice(grid.obj, t, grid.precision)
+
+def mem_pool_release(grid, t, o):
+    nbytes=mem_pool_bytes(grid,t)
+    if mem_pool_stats["bytes"] + nbytes > gpt.default.mem_pool_max_gb * 1024.**3.:
+        cgpt.delete_lattice(o)
+    else:
+        # keep a reference to the grid since the storage depends on it
+        mem_pool.setdefault((grid.obj,t,grid.precision),[]).append( (grid,o) )
+        mem_pool_stats["bytes"] += nbytes
+
+def mem_pool_trim(max_gb = 0.0):
+    for key in list(mem_pool.keys()):
+        pool=mem_pool[key]
+        while len(pool) > 0 and mem_pool_stats["bytes"] > max_gb * 1024.**3.:
+            grid,o=pool.pop()
+            mem_pool_stats["bytes"] -= mem_pool_bytes(grid,key[1])
+            cgpt.delete_lattice(o)
+        if len(pool) == 0:
+            del mem_pool[key]
+
+def meminfo(by = None):
+    if by == "site":
+        fmt=" %-60s %-16s %-16s %-12s"
+        gpt.message("==========================================================================================================================")
+        gpt.message("                                                 GPT Memory Report by Allocation Site")
+        gpt.message("==========================================================================================================================")
+        gpt.message(fmt % ("Site","Live/GB/rank","Peak/GB/rank","Allocations"))
+        for site in sorted(mem_sites, key = lambda x: -mem_sites[x]["peak"]):
+            rec=mem_sites[site]
+            gpt.message(fmt % (site,"%g" % (rec["live"] / 1024.**3.),"%g" % (rec["peak"] / 1024.**3.),rec["count"]))
+        gpt.message("==========================================================================================================================")
+        gpt.message("   Total: %g GB/rank live, %g GB/rank peak, %d allocations" % (mem_total["live"] / 1024.**3.,
+                                                                                mem_total["peak"] / 1024.**3.,
+                                                                                mem_total["count"]))
+        gpt.message("==========================================================================================================================")
+        return
+
+    assert(by is None)
     fmt=" %-8s %-30s %-12s %-20s %-12s %-16s %-20s"
     gpt.message("==========================================================================================================================")
     gpt.message("                                                 GPT Memory Report                ")
@@ -31,13 +131,16 @@ def meminfo():
     gpt.message(fmt % ("Index","Grid","Precision","OType", "CBType", "Size/GB", "Created at time"))
     tot_gb = 0.0
     for i,page in enumerate(mem_book):
-        grid,otype,created = mem_book[page]
-        gb = grid.gsites * grid.precision.nbytes * otype.nfloats / grid.cb.n / 1024.**3.
+        grid,otype,precision,created,site,nbytes = mem_book[page]
+        gb = nbytes * grid.Nprocessors / 1024.**3.
         tot_gb += gb
-        gpt.message(fmt % (i,grid.gdimensions,grid.precision.__name__,
+        gpt.message(fmt % (i,grid.gdimensions,precision.__name__,
                            otype.__name__,grid.cb.__name__,"%g" % gb,"%.6f s" % created))
     gpt.message("==========================================================================================================================")
     gpt.message("   Total: %g GB " % tot_gb)
+    gpt.message("   Peak: %g GB/rank" % (mem_total["peak"] / 1024.**3.))
+    gpt.message("   Pool: %g GB/rank, %d hits, %d misses" % (mem_pool_stats["bytes"] / 1024.**3.,
+                                                           mem_pool_stats["hits"],mem_pool_stats["misses"]))
     gpt.message("==========================================================================================================================")
 
 
@@ -45,6 +148,7 @@ class lattice:
     __array_priority__=1000000
     def __init__(self, first, second = None, third = None):
         self.metadata={}
+        self.zero=False
         cb=None
         if type(first) == gpt.grid:
             self.grid = first
@@ -53,37 +157,56 @@ class lattice:
                 p=second.split(";")
                 self.otype=gpt.str_to_otype(p[0])
                 cb=gpt.str_to_cb(p[1])
-                self.v_obj = [ cgpt.create_lattice(self.grid.obj, t, self.grid.precision) for t in self.otype.v_otype ]
+                self._v_obj = [ mem_pool_allocate(self.grid, t) for t in self.otype.v_otype ]
             else:
                 self.otype = second
                 if not third is None:
-                    self.v_obj = third
+                    self._v_obj = third
                 else:
-                    self.v_obj = [ cgpt.create_lattice(self.grid.obj, t, self.grid.precision) for t in self.otype.v_otype ]
+                    self._v_obj = [ mem_pool_allocate(self.grid, t) for t in self.otype.v_otype ]
         elif type(first) == gpt.lattice:
             # Note that copy constructor only creates a compatible lattice but does not copy its contents!
             self.grid = first.grid
             self.otype = first.otype
-            self.v_obj = [ cgpt.create_lattice(self.grid.obj, t, self.grid.precision) for t in self.otype.v_otype ]
+            self._v_obj = [ mem_pool_allocate(self.grid, t) for t in self.otype.v_otype ]
             cb = first.checkerboard()
         else:
             raise Exception("Unknown lattice constructor")
         # use first pointer to index page in memory book
-        mem_book[self.v_obj[0]] = (self.grid,self.otype,gpt.time())
+        site=mem_site()
+        nbytes=self.grid.gsites * self.grid.precision.nbytes * self.otype.nfloats / self.grid.cb.n / self.grid.Nprocessors
+        mem_site_allocate(site,nbytes)
+        mem_book[self._v_obj[0]] = (self.grid,self.otype,self.grid.precision,gpt.time(),site,nbytes)
         if not cb is None:
             self.checkerboard(cb)
 
+    @property
+    def v_obj(self):
+        # storage of a lattice that is known to be zero is only cleared when accessed
+        if self.zero:
+            self.zero=False
+            for o in self._v_obj:
+                cgpt.lattice_set_val(o, (), 0)
+        return self._v_obj
+
+    def overwrite(self):
+        # storage that is about to be overwritten on all sites does not need to be cleared
+        self.zero=False
+        return self._v_obj
+
     def __del__(self):
-        del mem_book[self.v_obj[0]]
-        for o in self.v_obj:
-            cgpt.delete_lattice(o)
+        grid,otype,precision,created,site,nbytes = mem_book[self._v_obj[0]]
+        mem_site_release(site,nbytes)
+        del mem_book[self._v_obj[0]]
+        for i,o in enumerate(self._v_obj):
+            mem_pool_release(self.grid,self.otype.v_otype[i],o)
 
     def checkerboard(self, val = None):
         if val is None:
             if self.grid.cb != gpt.redblack:
                 return gpt.none
 
-            cb=cgpt.lattice_get_checkerboard(self.v_obj[0]) # all have same cb, use 0
+            cb=cgpt.lattice_get_checkerboard(self._v_obj[0]) # all have same cb, use 0
             if cb == gpt.even.tag:
                 return gpt.even
             elif cb == gpt.odd.tag:
@@ -93,7 +216,7 @@ class lattice:
         else:
             if val != gpt.none:
                 assert(self.grid.cb == gpt.redblack)
-                for o in self.v_obj:
+                for o in self._v_obj:
                     cgpt.lattice_change_checkerboard(o,val.tag)
 
     def describe(self):
@@ -105,37 +228,87 @@ class lattice:
             if key == slice(None,None,None):
                 key = ()
 
+        if key == () and gpt.util.isnum(value) and value == 0:
+            self.zero=True
+            return
+
         if type(key) == tuple:
+            if key == ():
+                self.overwrite()
             if len(self.v_obj) == 1:
                 cgpt.lattice_set_val(self.v_obj[0], key, gpt.util.tensor_to_value(value))
             elif type(value) == int and value == 0:
                 for i in self.otype.v_idx:
                     cgpt.lattice_set_val(self.v_obj[i], key, 0)
-            else:
+            elif key == ():
                 for i in self.otype.v_idx:
                     cgpt.lattice_set_val(self.v_obj[i], key, gpt.tensor(value.array[self.otype.v_n0[i]:self.otype.v_n1[i]],self.otype.v_otype[i]).array)
+            else:
+                # all components in a single import
+                self[coordinates_point(key)]=gpt.util.tensor_to_value(value)
         elif type(key) == numpy.ndarray:
-            cgpt.lattice_import(self.v_obj, key, value)
+            cgpt.lattice_import(self.v_obj, key, self.import_array(len(key), value))
         else:
             assert(0)
 
     def __getitem__(self, key):
+        if self.zero:
+            if type(key) == tuple:
+                return gpt.util.value_to_tensor(numpy.zeros(self.otype.shape,dtype=numpy.complex128), self.otype)
+            elif type(key) == numpy.ndarray:
+                return numpy.zeros((len(key),) + self.otype.shape,dtype=self.grid.precision.complex_dtype)
+
         if type(key) == tuple:
             if len(self.v_obj) == 1:
                 return gpt.util.value_to_tensor(cgpt.lattice_get_val(self.v_obj[0], key), self.otype)
             else:
-                val=cgpt.lattice_get_val(self.v_obj[0], key)
-                for i in self.otype.v_idx[1:]:
-                    val=numpy.append(val,cgpt.lattice_get_val(self.v_obj[i], key))
-                return gpt.util.value_to_tensor(val, self.otype)
+                # all components in a single export
+                val=cgpt.lattice_export(self.v_obj, coordinates_point(key))
+                return gpt.util.value_to_tensor(val[0], self.otype)
         elif type(key) == numpy.ndarray:
             return cgpt.lattice_export(self.v_obj,key)
         else:
             assert(0)
 
+    def import_array(self, n, value):
+        # data for n sites in the layout of lattice_import, converted at most once
+        shape=(n,) + self.otype.shape
+        dtype=self.grid.precision.complex_dtype
+        if type(value) == memoryview:
+            return value
+        value=gpt.util.tensor_to_value(value)
+        if type(value) == numpy.ndarray and value.size == numpy.prod(shape):
+            return numpy.ascontiguousarray(value,dtype=dtype).reshape(shape)
+        return numpy.ascontiguousarray(numpy.broadcast_to(value,shape),dtype=dtype)
+
     def mview(self):
         return [ cgpt.lattice_memory_view(o) for o in self.v_obj ]
 
+    def local_array(self):
+        # numpy array of the local sites with shape (local dimensions..., *otype.shape);
+        # this is a view of the lattice memory if the SIMD layout permits it and
+        # a de-interleaved copy otherwise.  For checkerboarded grids, the local
+        # dimensions are those of the reduced lattice.
+        Nsimd,simd,rdim=cgpt.grid_get_layout(self.grid.obj)
+        nd=len(rdim)
+        dtype=self.grid.precision.complex_dtype
+        # memory layout is (o_{nd-1},...,o_0,word,i_{nd-1},...,i_0) with local
+        # coordinate x_mu = o_mu + i_mu*rdim[mu], bring it to (x_0,...,x_{nd-1},word)
+        axes=[]
+        for mu in range(nd):
+            axes += [ 2*nd - mu, nd - 1 - mu ]
+        axes.append(nd)
+        ldim=[ simd[mu]*rdim[mu] for mu in range(nd) ]
+        res=[]
+        for i,mv in enumerate(self.mview()):
+            shape=self.otype.shape if len(self.v_obj) == 1 else (self.otype.v_n1[i] - self.otype.v_n0[i],)
+            words=int(numpy.prod(shape))
+            a=numpy.frombuffer(mv,dtype=dtype).reshape(list(reversed(rdim)) + [ words ] + list(reversed(simd)))
+            res.append(a.transpose(axes).reshape(ldim + list(shape)))
+        if len(res) == 1:
+            return res[0]
+        return numpy.concatenate(res,axis=nd)
+
     def __repr__(self):
         return "lattice(%s,%s)" % (self.otype.__name__,self.grid.precision.__name__)
 
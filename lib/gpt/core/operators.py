@@ -19,6 +19,7 @@
 import cgpt
 import gpt
 import numpy as np
+from gpt.core.batch import batch_eval
 
 def get_lattice(e):
     if type(e) == gpt.expr:
@@ -28,6 +29,8 @@ def get_lattice(e):
         for i in e:
             if type(i[1]) == gpt.lattice:
                 return i[1]
+            elif type(i[1]) == gpt.shifted:
+                return i[1].lattice
         assert(0) # should never happen for a properly formed expression
     else:
         assert(0)
@@ -73,8 +76,11 @@ def trace(l, t = None):
 
 def expr_eval(first, second = None, ac = False):
 
+    if type(first) == gpt.batch:
+        return batch_eval(first, second, ac)
+
     if not second is None:
-        t_obj = first.v_obj
+        t_obj = True
         e = gpt.expr(second)
     else:
         if type(first) == gpt.lattice:
@@ -87,24 +93,176 @@ def expr_eval(first, second = None, ac = False):
         n = len(otype.v_idx)
         t_obj = None
 
-    if gpt.default.is_verbose("eval"):
+    # operands that are known to be zero are cleared here, shifted
+    # copies are returned to the pool when this function returns
+    plan,operands,coefficients,shifts=gpt.eval_plan.get(e)
+
+    if not t_obj is None:
+        # the first accumulation into a zero lattice is a plain store
+        if first.zero:
+            ac = False
+        t_obj = first.overwrite() if not ac else first.v_obj
+
+    verbose=gpt.default.is_verbose("eval")
+    if verbose:
         gpt.message("GPT::verbose::eval: " + str(e))
+        gpt.message("GPT::verbose::eval: plan cache %d hits, %d misses, %d plans" %
+                    (gpt.eval_plan.stats["hits"],gpt.eval_plan.stats["misses"],len(gpt.eval_plan.cache)))
 
+    t0=gpt.time()
     if not t_obj is None:
         for i,t in enumerate(t_obj):
-            assert(0 == cgpt.eval(t, e.val, e.unary, ac,i))
-        return first
+            assert(0 == plan(t, operands, coefficients, ac, i))
+        dst=first
     else:
         assert(ac == False)
-        t_obj,s_ot,s_pr=[0]*n,[0]*n,[0]*n
-        for i in otype.v_idx:
-            t_obj[i],s_ot[i],s_pr[i]=cgpt.eval(t_obj[i], e.val, e.unary, False,i)
+        if not plan.otype is None:
+            # result type is known, evaluate into (pooled) storage
+            dst=gpt.lattice(grid,plan.otype)
+            for i,t in enumerate(dst.v_obj):
+                assert(0 == plan(t, operands, coefficients, False, i))
+        else:
+            t_obj,s_ot,s_pr=[0]*n,[0]*n,[0]*n
+            for i in otype.v_idx:
+                t_obj[i],s_ot[i],s_pr[i]=plan(t_obj[i], operands, coefficients, False, i)
+            if len(s_ot) == 1:
+                otype=eval("gpt.otype." + s_ot[0])
+            else:
+                otype=gpt.otype.from_v_otype(s_ot)
+            plan.otype=otype
+            dst=gpt.lattice(grid,otype,t_obj)
+    t1=gpt.time()
+
+    flops,nbytes=plan.account(dst.grid, t1-t0, ac)
+    if verbose:
+        dt=max(t1-t0,1e-12) # fast evaluations may take no time at timer resolution
+        gpt.message("GPT::verbose::eval: %g s, %g GFlops/s, %g GB/s" % (t1-t0,flops/dt/1e9,nbytes/dt/1e9))
+
+    return dst
+
+def is_linear_combination(e, dst):
+    # linear combination of lattices compatible with dst
+    if e.unary != gpt.expr_unary.NONE:
+        return False
+    for coef,factors in e.val:
+        if len(factors) != 1:
+            return False
+        unary,l=factors[0]
+        if (unary != gpt.factor_unary.NONE or type(l) != gpt.lattice or
+            l.grid.obj != dst.grid.obj or l.otype.__name__ != dst.otype.__name__):
+            return False
+    return True
+
+def expr_lattices(e):
+    # ids of all lattices read by expression e
+    return set([ id(f[1].lattice if type(f[1]) == gpt.shifted else f[1]) for coef,factors in e.val
+                 for f in factors if type(f[1]) in [ gpt.lattice, gpt.shifted ] ])
+
+def eval_many(assignments):
+    # Evaluate a list of assignments (dst, expr, ac).  All right-hand sides
+    # are read before the destinations are written.  Linear combinations
+    # of lattices are evaluated in a single sweep per grid and otype in
+    # which each source is loaded once per site.  Other assignments are
+    # evaluated one after the other, if a destination is read by a later
+    # assignment all right-hand sides are evaluated to temporaries first.
+    assignments=[ (dst,gpt.expr(first),ac) for dst,first,ac in assignments ]
+    if not all([ is_linear_combination(e,dst) for dst,e,ac in assignments ]):
+        srcs=[ expr_lattices(e) for dst,e,ac in assignments ]
+        if any([ id(dst) in s for i,(dst,e,ac) in enumerate(assignments) for s in srcs[i+1:] ]):
+            assignments=[ (dst,gpt.expr(gpt.eval(e)),ac) for dst,e,ac in assignments ]
+        for dst,e,ac in assignments:
+            expr_eval(dst,e,ac)
+        return
+
+    groups={}
+    for dst,e,ac in assignments:
+        srcs,src_idx,rows=groups.setdefault((dst.grid.obj,dst.otype.__name__),([],{},{}))
+        if ac and id(dst) in rows:
+            row=rows[id(dst)]
+        else:
+            row=rows[id(dst)]=(dst,ac,{})
+        for coef,factors in e.val:
+            l=factors[0][1]
+            if not id(l) in src_idx:
+                src_idx[id(l)]=len(srcs)
+                srcs.append(l)
+            j=src_idx[id(l)]
+            row[2][j]=row[2].get(j,0.0) + coef
+
+    for srcs,src_idx,rows in groups.values():
+        rows=list(rows.values())
+        dsts=[ r[0] for r in rows ]
+        coef=np.zeros((len(rows),len(srcs)),dtype=np.complex128)
+        for i,r in enumerate(rows):
+            for j in r[2]:
+                coef[i,j]=r[2][j]
+        if gpt.default.is_verbose("eval"):
+            gpt.message("GPT::verbose::eval: %d destinations from %d sources in single sweep" % (len(dsts),len(srcs)))
+        # accumulation into a zero lattice that is not also a source is a plain store
+        src_ids=set([ id(s) for s in srcs ])
+        ac=[]
+        for r in rows:
+            if r[0].zero and not id(r[0]) in src_ids:
+                r[0].overwrite()
+                ac.append(0)
+            else:
+                ac.append(int(r[1]))
+        for i in dsts[0].otype.v_idx:
+            cgpt.multi_linear_combination(dsts,srcs,coef,ac,i)
+
+def expr_reduce(first, kind, dim = -1, ref = None, phases = None):
+    # evaluate expression and reduce it in the same sweep, returns
+    # otype of expression and local results of all components;
+    # for a list of expressions, a list of these is returned and
+    # all reductions share a single global sum
+    if type(first) == list:
+        e = [ gpt.expr(x) for x in first ]
+        ref = [ ref ] * len(e) if type(ref) != list else ref
+    else:
+        e = [ gpt.expr(first) ]
+        ref = [ ref ]
+
+    verbose=gpt.default.is_verbose("eval")
+    plans=[]
+    args=[]
+    shifts=[] # shifted copies are returned to the pool after the reduction
+    for i,x in enumerate(e):
+        n = len(get_lattice(x).otype.v_idx)
+        plan,operands,coefficients,x_shifts=gpt.eval_plan.get(x)
+        shifts+=x_shifts
+        plans.append(plan)
+        args.append( (plan.obj, operands, coefficients, None if ref[i] is None else ref[i].v_obj, n) )
+        if verbose:
+            gpt.message("GPT::verbose::eval: %s(%s)" % (kind,str(x)))
+
+    t0=gpt.time()
+    r=cgpt.eval_reduce(args, kind, dim, phases)
+    t1=gpt.time()
+
+    flops,nbytes=0.0,0.0
+    for i,plan in enumerate(plans):
+        f,b=plan.account(get_grid(e[i]), (t1-t0)/len(plans), None)
+        flops+=f
+        nbytes+=b
+    if verbose:
+        dt=max(t1-t0,1e-12) # fast evaluations may take no time at timer resolution
+        gpt.message("GPT::verbose::eval: %g s, %g GFlops/s, %g GB/s" % (t1-t0,flops/dt/1e9,nbytes/dt/1e9))
+
+    res=[]
+    for rp in r:
+        s_ot=[ x[1] for x in rp ]
         if len(s_ot) == 1:
             otype=eval("gpt.otype." + s_ot[0])
         else:
             otype=gpt.otype.from_v_otype(s_ot)
-        return gpt.lattice(grid,otype,t_obj)
+        res.append( (otype,[ x[0] for x in rp ]) )
+
+    if type(first) == list:
+        return res
+    return res[0]
 
 def sum(e):
-    l=gpt.eval(e)
-    return gpt.util.value_to_tensor( cgpt.lattice_sum(l.obj), l.otype )
+    if type(e) == gpt.lattice and e.zero:
+        return gpt.util.value_to_tensor(np.zeros(e.otype.shape,dtype=np.complex128), e.otype)
+    otype,r=expr_reduce(e,"sum")
+    return gpt.util.value_to_tensor( np.concatenate(r).reshape(otype.shape), otype )
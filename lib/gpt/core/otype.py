@@ -153,9 +153,68 @@ class ot_vcomplex:
         self.v_idx=range(len(self.v_n0))
         self.v_otype = [ ot_vcomplex.fundamental[x] for x in decomposition ]
 
+    def __eq__(self, other):
+        return self.__name__ == getattr(other,"__name__",None)
+    def __hash__(self):
+        return hash(self.__name__)
+
 def vcomplex(grid, n):
     return gpt_object(grid, ot_vcomplex(n))
 
+###
+# Matrices acting on coarse vectors
+class ot_mcomplex10(ot_base):
+    nfloats=2*10*10
+    shape=(10,10)
+    transposed=(1,0)
+    v_otype=[ "ot_mcomplex10" ]
+
+class ot_mcomplex20(ot_base):
+    nfloats=2*20*20
+    shape=(20,20)
+    transposed=(1,0)
+    v_otype=[ "ot_mcomplex20" ]
+
+class ot_mcomplex40(ot_base):
+    nfloats=2*40*40
+    shape=(40,40)
+    transposed=(1,0)
+    v_otype=[ "ot_mcomplex40" ]
+
+class ot_mcomplex80(ot_base):
+    nfloats=2*80*80
+    shape=(80,80)
+    transposed=(1,0)
+    v_otype=[ "ot_mcomplex80" ]
+
+class ot_mcomplex:
+    fundamental={
+        10 : ot_mcomplex10,
+        20 : ot_mcomplex20,
+        40 : ot_mcomplex40,
+        80 : ot_mcomplex80,
+    }
+    def __init__(self, n):
+        # a matrix cannot be split up like a vector, only fundamental sizes
+        if not n in ot_mcomplex.fundamental:
+            raise Exception("Coarse matrix of size %d not in available fundamentals %s" % (n,list(ot_mcomplex.fundamental.keys())))
+        self.__name__="ot_mcomplex(%d)" % n
+        self.nfloats=2*n*n
+        self.shape=(n,n)
+        self.transposed=(1,0)
+        self.spintrace=None
+        self.colortrace=None
+        self.v_n0,self.v_n1 = [ 0 ],[ n ]
+        self.v_idx=range(1)
+        self.v_otype = [ ot_mcomplex.fundamental[n] ]
+    def __eq__(self, other):
+        return self.__name__ == getattr(other,"__name__",None)
+    def __hash__(self):
+        return hash(self.__name__)
+
+def mcomplex(grid, n):
+    return gpt_object(grid, ot_mcomplex(n))
+
 ###
 # String conversion for safe file input
 def str_to_otype(s):
@@ -169,6 +228,10 @@ def str_to_otype(s):
         "ot_vcomplex20" : ot_vcomplex20,
         "ot_vcomplex40" : ot_vcomplex40,
         "ot_vcomplex80" : ot_vcomplex80,
+        "ot_mcomplex10" : ot_mcomplex10,
+        "ot_mcomplex20" : ot_mcomplex20,
+        "ot_mcomplex40" : ot_mcomplex40,
+        "ot_mcomplex80" : ot_mcomplex80,
     }
     if s in base_types:
         return base_types[s]
@@ -176,7 +239,8 @@ def str_to_otype(s):
     assert(len(a)==2)
     assert(a[1][-1]==")")
     base_vtypes={
-        "ot_vcomplex" : ot_vcomplex
+        "ot_vcomplex" : ot_vcomplex,
+        "ot_mcomplex" : ot_mcomplex
     }
     return base_vtypes[a[0]](int(a[1][:-1]))
 
@@ -200,6 +264,12 @@ mtab = {
     (ot_mspincolor,ot_vspincolor) : (ot_vspincolor,([1,3],[0,1])),
 }
 
+# coarse matrices, results of cgpt carry the fundamental type
+mtab.update({ (m,r) : (r,(1,0))
+              for n in ot_mcomplex.fundamental
+              for m in [ ot_mcomplex(n), ot_mcomplex.fundamental[n] ]
+              for r in [ ot_mcomplex(n), ot_mcomplex.fundamental[n], ot_vcomplex(n), ot_vcomplex.fundamental[n] ] })
+
 ###
 # Outer product table
 otab = {
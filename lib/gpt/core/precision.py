@@ -16,13 +16,24 @@
 #    with this program; if not, write to the Free Software Foundation, Inc.,
 #    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
+import numpy
+
 class single:
     nbytes=4
+    complex_dtype=numpy.complex64
     def __init__(self):
         pass
 
 class double:
     nbytes=8
+    complex_dtype=numpy.complex128
+    def __init__(self):
+        pass
+
+# storage only, block floating point with 16 bit mantissas and a
+# shared scale per site, see gpt.compressed
+class bfp16:
+    nbytes=2
     def __init__(self):
         pass
 
@@ -31,5 +42,7 @@ def str_to_precision(s):
         return single
     elif s == "double":
         return double
+    elif s == "bfp16":
+        return bfp16
     else:
         assert(0)
@@ -17,8 +17,56 @@
 #    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 import cgpt, gpt, numpy
+from gpt.core.batch import batch_norm2, batch_innerProduct, batch_axpy_norm2
 
-def cshift(first, second, third, fourth = None):
+class shifted:
+    # lazy cshift(lattice, dir, disp) factor, each distinct shifted lattice
+    # is copied once per evaluation of an expression to storage from the
+    # memory pool which is returned after the evaluation
+    def __init__(self, l, d, o):
+        self.lattice = l
+        self.dir = d
+        self.disp = o
+        self.grid = l.grid
+        self.otype = l.otype
+
+    def __repr__(self):
+        return "cshift(%s,%d,%d)" % (repr(self.lattice),self.dir,self.disp)
+
+    def __rmul__(self, l):
+        return gpt.expr(l) * gpt.expr(self)
+
+    def __mul__(self, l):
+        return gpt.expr(self) * gpt.expr(l)
+
+    def __truediv__(self, l):
+        assert(gpt.util.isnum(l))
+        return gpt.expr(self) * (1.0/l)
+
+    def __add__(self, l):
+        return gpt.expr(self) + gpt.expr(l)
+
+    def __sub__(self, l):
+        return gpt.expr(self) - gpt.expr(l)
+
+    def __neg__(self):
+        return gpt.expr(self) * (-1.0)
+
+def cshift_lazy(x, d, o):
+    if type(x) == gpt.lattice:
+        return shifted(x,d,o)
+    e=gpt.expr(x)
+    if any([ type(f) == shifted for coef,factors in e.val for unary,f in factors ]):
+        return shifted(gpt.eval(e),d,o)
+    # shift commutes with sums, products and site-local unary operations
+    return gpt.expr([ (coef, [ (unary, shifted(f,d,o) if type(f) == gpt.lattice else f) for unary,f in factors ])
+                      for coef,factors in e.val ], e.unary)
+
+def cshift(first, second, third, fourth = None, lazy = False):
+
+    if lazy:
+        assert(fourth is None)
+        return cshift_lazy(first,second,third)
 
     if type(first) == gpt.lattice and type(second) == gpt.lattice and not fourth is None:
         t=first
@@ -44,6 +92,10 @@ def copy(first, second = None):
         else:
             l=first
             t=gpt.lattice(l)
+        if l.zero:
+            t.checkerboard(l.checkerboard())
+            t[:]=0
+            return t
         for i in t.otype.v_idx:
             cgpt.copy(t.v_obj[i],l.v_obj[i])
         return t
@@ -52,7 +104,19 @@ def copy(first, second = None):
         assert(0)
 
 def convert(first, second):
-    if type(first) == gpt.lattice and type(second) == gpt.lattice:
+    if second == gpt.bfp16:
+        if type(first) == list:
+            return [ gpt.compressed(x, second) for x in first ]
+        return gpt.compressed(first, second)
+    elif type(second) == gpt.compressed:
+        if type(first) == gpt.lattice and first.grid.obj == second.grid.obj:
+            return second.decompress(first)
+        return convert(first, second.decompress())
+    elif type(first) == gpt.compressed or (type(first) == list and type(first[0]) == gpt.compressed):
+        if type(first) == list:
+            return [ convert(x, second) for x in first ]
+        return convert(first.decompress(), second)
+    elif type(first) == gpt.lattice and type(second) == gpt.lattice:
         assert(len(first.otype.v_idx) == len(second.otype.v_idx))
         for i in first.otype.v_idx:
             cgpt.convert(first.v_obj[i],second.v_obj[i])
@@ -74,20 +138,29 @@ def convert(first, second):
         assert(0)
 
 def norm2(l):
+    if type(l) == gpt.batch:
+        return batch_norm2(l)
     if type(l) == gpt.tensor:
         return l.norm2()
-    l=gpt.eval(l)
     if type(l) == gpt.lattice:
+        if l.zero:
+            return 0.0
         return sum([ cgpt.lattice_norm2(o) for o in l.v_obj ])
-    else:
-        assert(0)
+    otype,r=gpt.expr_reduce(l,"norm2")
+    return sum([ x[0].real for x in r ])
     
 def innerProduct(a,b):
+    if type(a) == gpt.batch or type(b) == gpt.batch:
+        return batch_innerProduct(a,b)
     if type(a) == gpt.tensor and type(b) == gpt.tensor:
         return gpt.adj(a) * b
     a=gpt.eval(a)
-    b=gpt.eval(b)
+    if type(b) != gpt.lattice:
+        otype,r=gpt.expr_reduce(b,"inner",ref = a)
+        return sum([ complex(x[0]) for x in r ])
     assert(len(a.otype.v_idx) == len(b.otype.v_idx))
+    if a.zero or b.zero:
+        return 0.0j
     return sum([ cgpt.lattice_innerProduct(a.v_obj[i],b.v_obj[i]) for i in a.otype.v_idx ])
 
 def innerProductNorm2(a,b):
@@ -100,13 +173,33 @@ def innerProductNorm2(a,b):
     return sum([ x[0] for x in r ]), sum([ x[1] for x in r ])
 
 def axpy_norm2(d, a, x, y):
+    if type(d) == gpt.batch:
+        return batch_axpy_norm2(d,a,x,y)
     x=gpt.eval(x)
     y=gpt.eval(y)
     assert(len(y.otype.v_idx) == len(x.otype.v_idx))
     assert(len(d.otype.v_idx) == len(x.otype.v_idx))
     return sum([ cgpt.lattice_axpy_norm2(d.v_obj[i],a,x.v_obj[i],y.v_obj[i]) for i in x.otype.v_idx ])
 
-def slice(x,dim):
-    x=gpt.eval(x)
-    r=sum([ numpy.array(cgpt.lattice_slice(o,dim)) for o in x.v_obj ])
-    return [ gpt.util.value_to_tensor(v,x.otype) for v in r ]
+def slice(x,dim,momenta = None):
+    # x can be an expression or a list of expressions, momenta a list
+    # of momenta p for which the sums over exp(i p.x) x are returned;
+    # all slices are computed in one sweep per expression and a single
+    # global sum
+    e=x if type(x) == list else [ x ]
+    grid=gpt.core.operators.get_grid(gpt.expr(e[0]))
+    fd=grid.fdimensions
+    phases=None
+    if not momenta is None:
+        if grid.cb.n != 1:
+            raise Exception("Momentum-projected slices need a full grid")
+        phases=numpy.array([ numpy.concatenate([ numpy.exp(1j*(p[mu] if mu < len(p) else 0.0)*numpy.arange(fd[mu])) for mu in range(grid.nd) ])
+                             for p in momenta ], dtype=numpy.complex128)
+    nmom=1 if momenta is None else len(momenta)
+
+    res=[]
+    for otype,r in gpt.expr_reduce(e,"slice",dim,phases=phases):
+        r=numpy.concatenate([ c.reshape(nmom*fd[dim],-1) for c in r ], axis=1)
+        v=[ gpt.util.value_to_tensor(v.reshape(otype.shape),otype) for v in r ]
+        res.append(v if momenta is None else [ v[m*fd[dim]:(m+1)*fd[dim]] for m in range(nmom) ])
+    return res if type(x) == list else res[0]
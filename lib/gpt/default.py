@@ -47,9 +47,19 @@ def get_ivec(tag, default):
 grid = get_ivec("--grid",[4,4,4,4])
 precision = { "single" : gpt.single, "double" : gpt.double }[get("--precision","double")]
 
+# memory pool
+mem_pool_max_gb=get_float("--mem_pool_max_gb",1.0)
+
 # IO parameters
 max_io_nodes=get_int("--max_io_nodes",256)
 
+# cached coordinate arrays and their distribution plans
+max_coordinate_cache=get_int("--max_coordinate_cache",16)
+
+# expression evaluation
+max_eval_plans=get_int("--max_eval_plans",1024)
+expr_max_terms=get_int("--expr_max_terms",16)
+
 # verbosity
 verbose_default="io,bicgstab,cg,fgcr,fgmres,mr,irl,power_iteration,checkpointer,deflate,block_operator,random"
 verbose_additional="eval"
@@ -76,7 +86,23 @@ if "--help" in sys.argv:
     print("")
     print("   sets verbosity options.  candidates: %s" % verbose_candidates)
     print("")
+    print(" --mem_pool_max_gb x")
+    print("")
+    print("   set maximal size of recycled lattice storage per rank in GB")
+    print("")
     print(" --max_io_nodes n")
     print("")
     print("   set maximal number of simultaneous IO nodes")
+    print("")
+    print(" --max_coordinate_cache n")
+    print("")
+    print("   set maximal number of cached coordinate arrays and distribution plans")
+    print("")
+    print(" --max_eval_plans n")
+    print("")
+    print("   set maximal number of cached expression evaluation plans")
+    print("")
+    print(" --expr_max_terms n")
+    print("")
+    print("   set maximal number of terms created by distributing products of expressions")
     print("--------------------------------------------------------------------------------")
@@ -23,6 +23,9 @@ class operator:
     def __init__(self, name, U, params, Ls = None):
         self.name = name
         self.U = U
+        self.Ls = Ls
+        self.operator_params = params
+        self.converted_operators = {}
         self.U_grid = U[0].grid
         self.U_grid_eo = gpt.grid(self.U_grid.gdimensions,self.U_grid.precision,gpt.redblack)
         if Ls is None:
@@ -52,10 +55,21 @@ class operator:
     def __del__(self):
         cgpt.delete_fermion_operator(self.obj)
 
+    def converted(self, precision):
+        # same operator with the gauge field converted to precision, created once
+        if precision == self.U_grid.precision:
+            return self
+        if not precision.__name__ in self.converted_operators:
+            self.converted_operators[precision.__name__] = operator(self.name, gpt.convert(self.U, precision), self.operator_params, self.Ls)
+        return self.converted_operators[precision.__name__]
+
     def unary(self, opcode, i, o):
+        if type(i) == gpt.batch:
+            # applied to one member after the other
+            return [ self.unary(opcode, i[j], o[j]) for j in range(len(i)) ]
         assert(len(i.v_obj) == 1)
         assert(len(o.v_obj) == 1)
-        return cgpt.apply_fermion_operator(self.obj,opcode,i.v_obj[0],o.v_obj[0])
+        return cgpt.apply_fermion_operator(self.obj,opcode,i.v_obj[0],o.overwrite()[0])
 
     def G5M(self, i, o):
         self.M(i,o)
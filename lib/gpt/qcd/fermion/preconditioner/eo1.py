@@ -50,11 +50,17 @@ import gpt, sys
 class eo1:
     def __init__(self, op):
         self.op = op
+        self.converted_preconditioners = {}
         self.F_grid_eo = op.F_grid_eo
         self.F_grid = op.F_grid
         self.tmp = gpt.vspincolor(self.F_grid_eo)
         self.tmp2 = gpt.vspincolor(self.F_grid_eo) # need for nested call in R
 
+    def converted(self, precision):
+        if not precision.__name__ in self.converted_preconditioners:
+            self.converted_preconditioners[precision.__name__] = eo1(self.op.converted(precision))
+        return self.converted_preconditioners[precision.__name__]
+
     def ImportPhysicalFermionSource(self, src, dst):
         self.op.ImportPhysicalFermionSource(src, dst)
 
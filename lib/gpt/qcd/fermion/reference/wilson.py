@@ -36,11 +36,10 @@ class wilson:
         assert(dst != src)
         dst[:]=0
         for mu in range(4):
-            src_plus = self.U[mu]*g.cshift(src,mu,+1)
-            dst += 1./2.*g.gamma[mu]*src_plus - 1./2.*src_plus
-
-            src_minus = g.cshift(self.Udag[mu]*src,mu,-1)
-            dst += -1./2.*g.gamma[mu]*src_minus - 1./2.*src_minus
+            src_plus = self.U[mu]*g.cshift(src,mu,+1,lazy=True)
+            src_minus = g.cshift(self.Udag[mu]*src,mu,-1,lazy=True)
+            dst += (1./2.*g.gamma[mu]*src_plus - 1./2.*src_plus
+                    - 1./2.*g.gamma[mu]*src_minus - 1./2.*src_minus)
 
     def Mooee(self, src, dst):
         assert(dst != src)
@@ -19,9 +19,16 @@
 import gpt
 
 class eo_ne:
-    def __init__(self, matrix, inverter):
+    def __init__(self, matrix, inverter, matrix_inner = None, guess = None):
         self.matrix = matrix
         self.inverter = inverter
+        self.guess = guess
+
+        # mixed-precision inverters also need the matrix in their inner
+        # precision, converted from the double-precision one if not given
+        self.matrix_inner = matrix_inner
+        if matrix_inner is None and hasattr(inverter,"inner_precision"):
+            self.matrix_inner = matrix.converted(inverter.inner_precision)
 
         self.F_grid_eo=matrix.F_grid_eo
         self.F_grid=matrix.F_grid
@@ -34,25 +41,31 @@ class eo_ne:
         self.oo=gpt.vspincolor(self.F_grid_eo)
         self.ftmp=gpt.vspincolor(self.F_grid)
 
-    def __call__(self, src_sc, dst_sc):
+    def inverter_matrix(self):
+        mat=lambda i,o: self.matrix.NDagN(i,o)
+        if self.matrix_inner is None:
+            return mat
+        return (mat,lambda i,o: self.matrix_inner.NDagN(i,o),self.matrix_inner.F_grid_eo)
 
+    def iterations(self):
+        history=getattr(self.inverter,"history",None)
+        return None if history is None else len(history)
+
+    def import_source(self, src_sc, t1, ie, io):
         self.matrix.ImportPhysicalFermionSource(src_sc, self.ftmp)
 
-        gpt.pick_cb(gpt.even,self.ie,self.ftmp)
-        gpt.pick_cb(gpt.odd,self.io,self.ftmp)
+        gpt.pick_cb(gpt.even,ie,self.ftmp)
+        gpt.pick_cb(gpt.odd,io,self.ftmp)
 
         # D^-1 = L NDagN^-1 R + S
 
-        self.matrix.R(self.ie, self.io, self.t1)
-
-        self.t2[:]=0
-        self.t2.checkerboard(gpt.even)
+        self.matrix.R(ie, io, t1)
 
-        self.inverter(lambda i,o: self.matrix.NDagN(i,o),self.t1,self.t2)
+    def export_solution(self, t2, dst_sc, ie, io):
+        # ie, io of the corresponding source
+        self.matrix.L(t2, self.oe, self.oo)
 
-        self.matrix.L(self.t2, self.oe, self.oo)
-
-        self.matrix.S(self.ie,self.io,self.t1,self.t2)
+        self.matrix.S(ie,io,self.t1,self.t2)
 
         self.oe += self.t1
         self.oo += self.t2
@@ -62,3 +75,41 @@ class eo_ne:
 
         self.matrix.ExportPhysicalFermionSolution(self.ftmp,dst_sc)
 
+    def __call__(self, src_sc, dst_sc):
+
+        if type(src_sc) == list:
+            # all right-hand sides in a single call of a block inverter,
+            # ie and io of each source are kept for the solution
+            if not self.matrix_inner is None:
+                raise Exception("Block inverters do not support a mixed-precision inner matrix")
+            t1=[ gpt.vspincolor(self.F_grid_eo) for x in src_sc ]
+            t2=[ gpt.vspincolor(self.F_grid_eo) for x in src_sc ]
+            ie=[ gpt.vspincolor(self.F_grid_eo) for x in src_sc ]
+            io=[ gpt.vspincolor(self.F_grid_eo) for x in src_sc ]
+            for i,x in enumerate(src_sc):
+                self.import_source(x, t1[i], ie[i], io[i])
+                t2[i][:]=0
+                t2[i].checkerboard(gpt.even)
+
+            self.inverter(self.inverter_matrix(),t1,t2)
+
+            for i,x in enumerate(src_sc):
+                self.export_solution(t2[i], dst_sc[i], ie[i], io[i])
+            return
+
+        self.import_source(src_sc, self.t1, self.ie, self.io)
+
+        mat=self.inverter_matrix()
+
+        if self.guess is None:
+            self.t2[:]=0
+            self.t2.checkerboard(gpt.even)
+        else:
+            self.guess(mat,self.t1,self.t2)
+
+        self.inverter(mat,self.t1,self.t2)
+
+        if not self.guess is None:
+            self.guess.update(self.t2,self.iterations())
+
+        self.export_solution(self.t2, dst_sc, self.ie, self.io)
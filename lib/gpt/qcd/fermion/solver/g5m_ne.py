@@ -19,22 +19,69 @@
 import gpt
 
 class g5m_ne:
-    def __init__(self, matrix, inverter):
+    def __init__(self, matrix, inverter, matrix_inner = None, guess = None):
         self.matrix = matrix
         self.inverter = inverter
+        self.guess = guess
         self.F_grid=matrix.F_grid
         self.ftmp=gpt.vspincolor(self.F_grid)
         self.ftmp2=gpt.vspincolor(self.F_grid)
         self.ftmp3=gpt.vspincolor(self.F_grid)
 
-    def __call__(self, src_sc, dst_sc):
+        # mixed-precision inverters also need the matrix in their inner
+        # precision, converted from the double-precision one if not given
+        self.matrix_inner = matrix_inner
+        if matrix_inner is None and hasattr(inverter,"inner_precision"):
+            self.matrix_inner = matrix.converted(inverter.inner_precision)
+        if not self.matrix_inner is None:
+            self.ftmp3_inner=gpt.vspincolor(self.matrix_inner.F_grid)
+
+    def inverter_matrix(self):
+        mat=lambda i,o: (self.matrix.G5M(i,self.ftmp3),self.matrix.G5M(self.ftmp3,o))
+        if self.matrix_inner is None:
+            return mat
+        return (mat,lambda i,o: (self.matrix_inner.G5M(i,self.ftmp3_inner),self.matrix_inner.G5M(self.ftmp3_inner,o)),self.matrix_inner.F_grid)
+
+    def iterations(self):
+        history=getattr(self.inverter,"history",None)
+        return None if history is None else len(history)
 
+    def import_source(self, src_sc, t):
         self.matrix.ImportPhysicalFermionSource(src_sc, self.ftmp)
 
         self.ftmp @= gpt.gamma[5] * self.ftmp
-        self.matrix.G5M(self.ftmp,self.ftmp2)
+        self.matrix.G5M(self.ftmp,t)
+
+    def __call__(self, src_sc, dst_sc):
+
+        mat=self.inverter_matrix()
+
+        if type(src_sc) == list:
+            # all right-hand sides in a single call of a block inverter
+            if not self.matrix_inner is None:
+                raise Exception("Block inverters do not support a mixed-precision inner matrix")
+            t=[ gpt.vspincolor(self.F_grid) for x in src_sc ]
+            sol=[ gpt.vspincolor(self.F_grid) for x in src_sc ]
+            for i,x in enumerate(src_sc):
+                self.import_source(x, t[i])
+                sol[i][:]=0
+
+            self.inverter(mat,t,sol)
+
+            for i,x in enumerate(sol):
+                self.matrix.ExportPhysicalFermionSolution(x,dst_sc[i])
+            return
+
+        self.import_source(src_sc, self.ftmp2)
         
-        self.ftmp[:]=0
-        self.inverter(lambda i,o: (self.matrix.G5M(i,self.ftmp3),self.matrix.G5M(self.ftmp3,o)),self.ftmp2,self.ftmp)
+        if self.guess is None:
+            self.ftmp[:]=0
+        else:
+            self.guess(mat,self.ftmp2,self.ftmp)
+
+        self.inverter(mat,self.ftmp2,self.ftmp)
+
+        if not self.guess is None:
+            self.guess.update(self.ftmp,self.iterations())
 
         self.matrix.ExportPhysicalFermionSolution(self.ftmp,dst_sc)
@@ -19,12 +19,30 @@
 import gpt
 
 class propagator:
-    def __init__(self, sc_solver):
+    def __init__(self, sc_solver, block = False):
+        # block: hand all 12 spin-color sources to sc_solver at once,
+        # for use with a block inverter
         self.sc_solver = sc_solver
+        self.block = block
 
     def __call__(self, src, dst):
         grid=src.grid
         # sum_n D^-1 vn vn^dag src = D^-1 vn (src^dag vn)^dag
+        if self.block:
+            src_sc=[ gpt.vspincolor(grid) for i in range(12) ]
+            dst_sc=[ gpt.vspincolor(grid) for i in range(12) ]
+
+            for s in range(4):
+                for c in range(3):
+                    gpt.qcd.prop_to_ferm(src_sc[s*3 + c],src,s,c)
+
+            self.sc_solver(src_sc,dst_sc)
+
+            for s in range(4):
+                for c in range(3):
+                    gpt.qcd.ferm_to_prop(dst,dst_sc[s*3 + c],s,c)
+            return
+
         dst_sc,src_sc=gpt.vspincolor(grid),gpt.vspincolor(grid)
 
         for s in range(4):
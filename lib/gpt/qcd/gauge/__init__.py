@@ -24,5 +24,5 @@ def plaquette(U):
     vol=float(U[0].grid.gsites)
     for mu in range(4):
         for nu in range(mu):
-            tr += g.sum( g.trace(U[mu] * g.cshift( U[nu], mu, 1) * g.adj( g.cshift( U[mu], nu, 1 ) ) * g.adj( U[nu] )) )
+            tr += g.sum( g.trace(U[mu] * g.cshift( U[nu], mu, 1, lazy=True) * g.adj( g.cshift( U[mu], nu, 1, lazy=True ) ) * g.adj( U[nu] )) )
     return 2.*tr.real/vol/4./3./3.
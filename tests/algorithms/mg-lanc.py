@@ -166,3 +166,15 @@ solver=g.algorithms.iterative.cg({
 v_fine[:]=0
 solver(w.NDagN,start,v_fine)
 cg_undefl=solver.history
+
+# deflation with compressed eigenvectors, fine vectors are never stored
+cevec=g.block.compressed_evec(basis,coarse_evec)
+solver=g.algorithms.approx.deflate(
+    g.algorithms.iterative.cg({
+        "eps" : 1e-8,
+        "maxiter" : 1000
+    }),
+    cevec,ev3)
+v_fine[:]=0
+solver(w.NDagN,start,v_fine)
+cg_defl_compressed=solver.inverter.history
@@ -75,6 +75,18 @@ slv_fgmres = s.propagator(
             "maxiter": 1000,
             "restartlen": 20
         })))
+slv_pipelined_cg = s.propagator(
+    s.eo_ne(g.qcd.fermion.preconditioner.eo2(w),
+            g.algorithms.iterative.pipelined_cg({
+                "eps": 1e-6,
+                "maxiter": 1000
+            })))
+slv_block_cg = s.propagator(
+    s.eo_ne(g.qcd.fermion.preconditioner.eo2(w),
+            g.algorithms.iterative.block_cg({
+                "eps": 1e-6,
+                "maxiter": 1000
+            })), block = True)
 
 # rhs vectors
 dst_cg=g.mspincolor(grid)
@@ -82,6 +94,8 @@ dst_mr=g.mspincolor(grid)
 dst_bicgstab=g.mspincolor(grid)
 dst_fgcr=g.mspincolor(grid)
 dst_fgmres=g.mspincolor(grid)
+dst_block_cg=g.mspincolor(grid)
+dst_pipelined_cg=g.mspincolor(grid)
 
 # perform solves
 slv_cg(src, dst_cg)
@@ -94,3 +108,56 @@ slv_fgcr(src, dst_fgcr)
 g.message("FGCR finished: eps^2(CG) = %g" % g.norm2(dst_cg-dst_fgcr))
 slv_fgmres(src, dst_fgmres)
 g.message("FGMRES finished: eps^2(CG) = %g" % g.norm2(dst_cg-dst_fgmres))
+slv_pipelined_cg(src, dst_pipelined_cg)
+g.message("Pipelined CG finished: eps^2(CG) = %g" % g.norm2(dst_cg-dst_pipelined_cg))
+slv_block_cg(src, dst_block_cg)
+g.message("Block CG finished: eps^2(CG) = %g" % g.norm2(dst_cg-dst_block_cg))
+
+# mixed precision: residual in double, corrections from single-precision cg
+w_d=w.converted(g.double)
+slv_mixed = s.propagator(
+    s.eo_ne(g.qcd.fermion.preconditioner.eo2(w_d),
+            g.algorithms.iterative.defect_correcting(
+                g.algorithms.iterative.cg({
+                    "eps": 1e-4,
+                    "maxiter": 1000
+                }), {
+                    "eps": 1e-10,
+                    "maxiter": 20
+                })))
+src_d,dst_mixed,dst_cg_d=g.mspincolor(w_d.F_grid),g.mspincolor(w_d.F_grid),g.mspincolor(w_d.F_grid)
+g.convert(src_d, src)
+g.convert(dst_cg_d, dst_cg)
+slv_mixed(src_d, dst_mixed)
+g.message("Mixed precision finished: eps^2(CG) = %g" % g.norm2(dst_cg_d-dst_mixed))
+
+# multi-shift cg, all shifts of the even-odd preconditioned normal operator from one Krylov space
+eo2=g.qcd.fermion.preconditioner.eo2(w)
+shifts=[ 0.0, 0.01, 0.1 ]
+rhs=g.vspincolor(w.F_grid_eo)
+g.random("multi_shift").cnormal(rhs)
+rhs.checkerboard(g.even)
+ms_cg=g.algorithms.iterative.multi_shift_cg({
+    "eps": 1e-6,
+    "maxiter": 1000,
+    "shifts": shifts
+})
+sol=[ g.lattice(rhs) for s in shifts ]
+ms_cg(lambda i,o: eo2.NDagN(i,o), rhs, sol)
+tmp=g.lattice(rhs)
+for i,s in enumerate(shifts):
+    eo2.NDagN(sol[i],tmp)
+    g.message("Multi-shift CG shift %g: eps^2 = %g" % (s,g.norm2(tmp + s*sol[i] - rhs) / g.norm2(rhs)))
+g.message("Multi-shift CG finished in %d iterations" % len(ms_cg.history))
+
+# initial guesses from the previous spin-color columns
+chrono=g.algorithms.approx.chronological_guess({ "window": 4 })
+slv_chrono = s.propagator(
+    s.eo_ne(g.qcd.fermion.preconditioner.eo2(w),
+            g.algorithms.iterative.cg({
+                "eps": 1e-6,
+                "maxiter": 1000
+            }), guess = chrono))
+dst_chrono=g.mspincolor(grid)
+slv_chrono(src, dst_chrono)
+g.message("Chronological guess finished: eps^2(CG) = %g, iterations = %s" % (g.norm2(dst_cg-dst_chrono),str(chrono.iterations)))
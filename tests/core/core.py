@@ -99,3 +99,88 @@ g.message(cm)
 g.message(g.eval(g.trace(cm)))
 
 g.message(g.innerProductNorm2(src,src),g.norm2(src))
+
+# reductions of expressions do not create a temporary lattice
+g.message(g.sum(expr),g.sum(new))
+g.message(g.norm2(expr),g.norm2(new))
+g.message(g.innerProduct(src,expr),g.innerProduct(src,new))
+g.message(g.slice(g.trace(cm*cm),3))
+g.message(g.sum(vz30c + 0.3* vz30b))
+
+# shifted factors can be kept lazy and are resolved during evaluation
+g.message(g.norm2(g.cshift(src,0,1,lazy=True)*dst - g.cshift(src,0,1)*dst))
+
+# statements in an expression block are evaluated at the end of the block,
+# shared shifted factors and sub-products are evaluated only once
+with g.expression_block() as b:
+    b.eval(new,g.cshift(src,0,1,lazy=True)*dst + src)
+    s=b.sum(g.cshift(src,0,1,lazy=True)*dst)
+g.message(s.value,g.sum(new - src))
+
+# all right-hand sides of eval_many are read before the destinations are
+# written, also if some assignments are not linear combinations
+x,y=g.copy(src),g.copy(dst)
+g.eval_many([ (x, y, False), (y, x*x, False) ])
+g.message(g.norm2(x - dst), g.norm2(y - src*src))
+
+# momentum-projected slices of several expressions in a single reduction
+L=grid.fdimensions
+mom=[ [ 0, 0, 0, 0 ], [ 2.0*np.pi/L[0], 0, 0, 0 ] ]
+c=g.slice([ g.trace(cm*cm), g.adj(src)*src ],3,mom)
+g.message(c[1][0], g.slice(g.adj(src)*src,3))
+
+# numpy access to the local sites, a view of the lattice memory if possible
+a=src.local_array()
+g.message(a.shape, a[0,0,0,0] if grid.processor == 0 else None)
+
+# multi-component lattices move all components in a single import/export
+vc=g.vcomplex(grid,50)
+vc[:]=0
+vc[0,0,0,0]=g.vcomplex([ float(i) for i in range(50) ],50)
+g.message(vc[0,0,0,0])
+
+# coordinate arrays are cached together with their distribution plans
+pos=g.coordinates(grid)
+src[pos]=src[g.coordinates(grid)]
+g.message(g.coordinates_cache_stats())
+
+# compressed storage, arithmetic on the fly in the original precision
+csrc=g.convert(src,g.bfp16)
+g.meminfo()
+g.message(g.norm2(csrc - src) / g.norm2(src), g.innerProduct(csrc,src))
+
+# linear combinations and rotations of compressed bases decompress per site
+cbasis=g.convert([ src, dst ],g.bfp16)
+r=g.lattice(src)
+g.linear_combination(r,cbasis,np.array([ 0.5, 2.0 ],dtype=np.float64))
+g.message(g.norm2(r - 0.5*src - 2.0*dst) / g.norm2(r))
+g.rotate(cbasis,np.array([ [ 0.0, 1.0 ], [ 1.0, 0.0 ] ],dtype=np.float64),0,2,0,2)
+g.message(g.norm2(cbasis[0] - dst) / g.norm2(dst))
+
+# batched reductions return arrays and take a single global sum
+b=g.batch([ g.copy(src), g.copy(dst) ])
+g.message(g.norm2(b), g.norm2(src), g.norm2(dst))
+g.message(g.innerProduct(b,b), g.axpy_norm2(b, [ 1.0, 2.0 ], b, b))
+g.message(g.innerProduct(b,src), g.innerProduct(src,src), g.innerProduct(dst,src))
+
+# zero lattices are only cleared when needed, the first accumulation is a plain store
+new[:]=0
+g.message(new.zero, g.norm2(new))
+new+=src
+g.message(new.zero, g.norm2(new - src))
+
+# coarse link matrices act on coarse vectors in expressions, e.g., a hopping term
+A=g.mcomplex(grid,10)
+A[:]=g.mcomplex(np.identity(10)*0.5,10)
+cv=g.vcomplex(grid,10)
+cv[:]=g.vcomplex([ 1.0 ] * 10,10)
+cr=g.eval(A*cv + g.adj(A)*g.cshift(cv,0,1))
+g.message(cr.otype.__name__, g.norm2(cr) / g.norm2(cv))
+
+# inner products with a whole basis in one reduction, block Gram-Schmidt
+rng=g.random("orthogonalize")
+bs=[ rng.cnormal(g.vcolor(grid)) for i in range(4) ]
+for i in range(4):
+    g.orthogonalize(bs[i],bs[0:i],block=True)
+    bs[i] /= g.norm2(bs[i])**0.5
+g.message(g.inner_products(bs,bs[3]))